@@ -5,48 +5,100 @@
 이 모듈은 FastAPI 앱을 Uvicorn으로 구동하는 실행 진입점입니다.
 
 핵심 동작:
-- 전역 예외 후킹(`sys.excepthook`)으로 처리되지 않은 예외를 콘솔과 `error.log`에 기록
+- 전역 예외 후킹(`sys.excepthook`)으로 처리되지 않은 예외를 콘솔과 `error.log`(순환 로그)에 기록
+- `faulthandler`로 치명적 오류의 스택을 `faulthandler.log`에 기록
 - Windows/빌드 환경(PyInstaller 등) 호환을 위해 `multiprocessing.freeze_support()` 호출
-- `app_factory.app`을 임포트하여 Uvicorn 서버 실행
+- `app_factory.app`을 임포트하여 Uvicorn 서버 실행 (UVICORN_WORKERS로 워커 수 지정, uvloop/httptools 사용)
 
 주의:
 - 전역 예외 훅은 콘솔 창이 즉시 닫히는 환경에서 디버깅 편의를 위해 입력 대기(`input`)를 수행합니다.
-  서비스 환경(데몬/서비스)에서는 이 대기가 원치 않을 수 있으므로 배포 환경에 맞춰 조정하세요.
+  표준 입력이 터미널이 아닌 서비스 환경(데몬/도커)에서는 대기하지 않고 바로 종료합니다.
 """
 
 # src/main.py
 import os
 import sys
+import importlib.util
 import faulthandler
 import multiprocessing
 import logging
 import traceback
+from logging.handlers import RotatingFileHandler
 import uvicorn
 
+# 크래시 기록용 로거: `error.log`에 이어 쓰고(이전 크래시 보존), 10MB마다 최대 3개까지 순환
+crash_logger = logging.getLogger("braintrace.crash")
+crash_logger.propagate = False
+crash_logger.addHandler(
+    RotatingFileHandler("error.log", maxBytes=10_000_000, backupCount=3, encoding="utf-8")
+)
+
+# 세그폴트 등 파이썬 예외로 잡히지 않는 치명적 오류의 스택도 남김
+faulthandler_log = open("faulthandler.log", "a", encoding="utf-8")
+faulthandler.enable(file=faulthandler_log)
+
 
 def global_except_hook(exc_type, exc_value, exc_tb):
     """처리되지 않은 예외를 콘솔과 파일로 기록하고 안전 종료합니다.
 
     동작:
       - 콘솔에 스택 트레이스를 즉시 출력
-      - 현재 작업 디렉터리의 `error.log` 파일에 동일한 정보를 기록
-      - 콘솔 창이 바로 닫히는 것을 방지하기 위해 Enter 입력 대기 후 종료
+      - 현재 작업 디렉터리의 `error.log` 파일에 동일한 정보를 추가 기록
+      - 대화형 콘솔이면 창이 바로 닫히지 않도록 Enter 입력 대기 후 종료
+        (systemd/docker 등 비대화형 환경에서는 대기 없이 바로 종료해 재시작을 막지 않음)
     """
     # 콘솔에 즉시 출력
     traceback.print_exception(exc_type, exc_value, exc_tb)
     # 로그 파일에도 기록
-    with open("error.log", "w", encoding="utf-8") as f:
-        traceback.print_exception(exc_type, exc_value, exc_tb, file=f)
+    crash_logger.critical("Unhandled exception", exc_info=(exc_type, exc_value, exc_tb))
     # 일시 정지해서 콘솔창이 바로 닫히지 않게
-    input("에러 발생 – 콘솔에 표시된 내용을 확인하고 Enter 키를 누르세요…")
+    if sys.stdin is not None and sys.stdin.isatty():
+        input("에러 발생 – 콘솔에 표시된 내용을 확인하고 Enter 키를 누르세요…")
     sys.exit(1)
 
 sys.excepthook = global_except_hook
 
 from app_factory import app
 
+
+def resolve_server_options() -> dict:
+    """Uvicorn 워커 수와 이벤트 루프/HTTP 파서 구현을 결정합니다.
+
+    규칙:
+      - 워커 수는 환경변수 UVICORN_WORKERS(기본 1)로 지정 (정수가 아니면 경고 후 1)
+      - 2 이상은 QDRANT_URL(원격 Qdrant)이 설정된 경우에만 허용
+        (로컬 디스크 모드 Qdrant는 한 프로세스만 저장소를 열 수 있음)
+      - uvloop/httptools가 설치되어 있으면 사용하고, 없으면(Windows 등) asyncio/h11로 대체
+    """
+    raw_workers = os.getenv("UVICORN_WORKERS", "1")
+    try:
+        workers = max(1, int(raw_workers))
+    except ValueError:
+        logging.warning("UVICORN_WORKERS 값(%s)이 정수가 아니어서 워커 1개로 실행합니다.", raw_workers)
+        workers = 1
+    if workers > 1 and not os.getenv("QDRANT_URL", "").strip():
+        logging.warning("로컬 디스크 모드 Qdrant는 다중 워커를 지원하지 않아 워커 1개로 실행합니다.")
+        workers = 1
+
+    has_uvloop = sys.platform != "win32" and importlib.util.find_spec("uvloop") is not None
+    has_httptools = importlib.util.find_spec("httptools") is not None
+    return {
+        "workers": workers,
+        "loop": "uvloop" if has_uvloop else "asyncio",
+        "http": "httptools" if has_httptools else "h11",
+    }
+
+
 if __name__ == "__main__":
     # PyInstaller 등으로 빌드된 환경에서 멀티프로세싱 이슈 방지
     multiprocessing.freeze_support()
-    # Uvicorn 개발 서버 실행(리로드 비활성화, 0.0.0.0:8000)
-    uvicorn.run(app, host="0.0.0.0", reload=False, port=8000)
\ No newline at end of file
+    options = resolve_server_options()
+    # Uvicorn 서버 실행(리로드 비활성화, 0.0.0.0:8000)
+    # 다중 워커는 각 프로세스가 앱을 직접 임포트해야 하므로 임포트 문자열로 전달
+    uvicorn.run(
+        "app_factory:app" if options["workers"] > 1 else app,
+        host="0.0.0.0",
+        reload=False,
+        port=8000,
+        **options
+    )
\ No newline at end of file
@@ -198,6 +198,8 @@ async def process_text_endpoint(request_data: ProcessTextRequest):
     else:
         # 선택된 AI 서비스가 제공하는 추출 로직 호출
         nodes, edges = ai_service.extract_graph_components(text, source_id)
+    # 노드 임베딩 업서트가 끝났으므로 HNSW 인덱스 구성을 활성화
+    embedding_service.finalize_index(brain_id)
     logging.info("추출된 노드: %s", nodes)
     logging.info("추출된 엣지: %s", edges)
 
@@ -430,7 +430,7 @@ async def delete_descriptions_by_source_id(brain_id: str, source_id: str):
         
         # 2. 벡터 DB에서 임베딩 삭제
         from services.embedding_service import delete_node
-        delete_node(source_id, brain_id)
+        delete_node([source_id], brain_id)
         
     except Exception as e:
         raise HTTPException(500, str(e))
@@ -2,51 +2,285 @@
 임베딩/검색 서비스
 ------------------
 
-이 모듈은 KoE5 임베딩 모델을 사용해 텍스트를 벡터화하고, 로컬 디스크 모드의 Qdrant를 통해
+이 모듈은 all-MiniLM-L6-v2 임베딩 모델을 사용해 텍스트를 벡터화하고, 로컬 디스크 모드의 Qdrant를 통해
 다음 기능을 제공합니다.
 
 - 임베딩 생성(`encode_text`, `encode`)
 - 벡터 컬렉션 초기화/삭제(`initialize_collection`, `delete_collection`)
+- 대량 업서트 후 HNSW 인덱스 활성화(`finalize_index`)
 - 노드(설명 기반) 임베딩 생성 및 업서트(`update_index_and_get_embeddings`)
+- 여러 노드 설명을 한 번에 임베딩해 업서트(`store_embeddings_batch`)
+- 미리 계산된 임베딩을 가진 여러 노드를 한 번에 업서트(`store_node_embeddings`)
 - 유사 노드/문장 검색(`search_similar_nodes`, `search_similar_descriptions`)
 - 인덱스 준비 상태 확인(`is_index_ready`)
 
 설계 노트:
 - Qdrant는 프로젝트 `backend/data/qdrant` 하위에 디스크 기반으로 저장됩니다.
 - 컬렉션 이름은 브레인 ID를 접두어로 구분합니다: `brain_{brain_id}`.
-- KoE5 모델은 첫 토큰([CLS]) 임베딩을 사용합니다.
+- 배포 환경은 영어 전용이므로 모든 텍스트를 영어 모델(정규화된 문장 임베딩)로 벡터화합니다.
 - 임베딩 저장 시, Qdrant `payload`에 `source_id`, `name`, `description`, `format_index`, `point_id` 등을 포함합니다.
 """
 import torch
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
-import torch
-from transformers import AutoTokenizer, AutoModel
 from sentence_transformers import SentenceTransformer
 import numpy as np
 import logging
 import os
+import platform
+import hashlib
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
-import langid
 import uuid
 
 # ================================================
-# Qdrant 및 KoE5 임베딩 모델 초기화
+# Qdrant 및 임베딩 모델 초기화
 # ================================================
 
 # 디스크 기반 Qdrant 저장 경로 설정
 QDRANT_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "qdrant")
 os.makedirs(QDRANT_PATH, exist_ok=True)
 
-# Qdrant 클라이언트 생성 (로컬 디스크 모드)
-client = QdrantClient(path=QDRANT_PATH)
+# Qdrant 클라이언트 생성
+# - QDRANT_URL이 지정되면 원격 서버에 gRPC로 연결 (벡터를 JSON 배열 대신 packed bytes로 전송)
+# - 지정되지 않으면 로컬 디스크 모드
+QDRANT_URL = os.getenv("QDRANT_URL", "").strip()
+if QDRANT_URL:
+    client = QdrantClient(url=QDRANT_URL, prefer_grpc=True)
+else:
+    client = QdrantClient(path=QDRANT_PATH)
+
+
+# 영어 임베딩 모델 이름
+ENG_MODEL_NAME = "all-MiniLM-L6-v2"
+
+# CPU 환경에서 ONNX Runtime 백엔드 사용 여부 (EMBED_ONNX=false 로 비활성화)
+USE_ONNX_BACKEND = os.getenv("EMBED_ONNX", "true").lower() in ("1", "true", "yes")
+
+# CPU 환경에서 INT8 양자화 사용 여부 (EMBED_INT8=false 로 비활성화)
+# - ONNX 백엔드: 모델 저장소에 포함된 사전 양자화 ONNX 모델을 로드
+# - PyTorch 백엔드: nn.Linear 계층을 INT8 동적 양자화
+USE_INT8_QUANTIZATION = os.getenv("EMBED_INT8", "true").lower() in ("1", "true", "yes")
+
+
+def _onnx_file_names() -> List[str]:
+    """
+    CPU ONNX 백엔드에서 시도할 모델 파일 목록을 우선순위대로 반환합니다.
+    - EMBED_INT8이 켜져 있으면 CPU 아키텍처에 맞는 INT8 모델(ARM: qint8_arm64, x86: quint8_avx2)을 먼저 시도
+    - 그다음 그래프 최적화된 FP32 O3 모델
+    """
+    file_names = []
+    if USE_INT8_QUANTIZATION:
+        if platform.machine().lower() in ("arm64", "aarch64"):
+            file_names.append("onnx/model_qint8_arm64.onnx")
+        else:
+            file_names.append("onnx/model_quint8_avx2.onnx")
+    file_names.append("onnx/model_O3.onnx")
+    return file_names
+
+
+def _quantize_int8(model: SentenceTransformer) -> SentenceTransformer:
+    """
+    트랜스포머의 nn.Linear 계층을 INT8 동적 양자화합니다.
+    - x86은 fbgemm, ARM은 qnnpack 엔진을 사용합니다.
+    Notes:
+        - 가중치 메모리가 약 4배 줄고 CPU int8 GEMM을 사용합니다. 코사인 유사도 차이는 1% 미만입니다.
+    """
+    engine = "qnnpack" if platform.machine().lower() in ("arm64", "aarch64") else "fbgemm"
+    if engine in torch.backends.quantized.supported_engines:
+        torch.backends.quantized.engine = engine
+    model[0].auto_model = torch.quantization.quantize_dynamic(
+        model[0].auto_model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+    return model
+
+
+# GPU 환경에서 트랜스포머 forward를 torch.compile로 컴파일할지 여부 (EMBED_COMPILE=false 로 비활성화)
+USE_TORCH_COMPILE = os.getenv("EMBED_COMPILE", "true").lower() in ("1", "true", "yes")
+
+# 워밍업에 사용할 토큰 길이 구간 (all-MiniLM-L6-v2의 max_seq_length는 256)
+COMPILE_WARMUP_LENGTHS = (64, 128, 256)
+
+# 임베딩 배치 크기 (컴파일된 모델은 모든 배치를 이 크기로 채워 실행)
+ENCODE_BATCH_SIZE = 64
+
+
+def _bucket_length(n_tokens: int) -> int:
+    """
+    토큰 수를 담을 수 있는 가장 짧은 길이 구간(COMPILE_WARMUP_LENGTHS)을 반환합니다.
+    """
+    for length in COMPILE_WARMUP_LENGTHS:
+        if n_tokens <= length:
+            return length
+    return COMPILE_WARMUP_LENGTHS[-1]
+
+
+def _bucket_features(tokenizer, rows: List[List[int]], length: int, device) -> Dict[str, torch.Tensor]:
+    """
+    토큰 id 행들을 (ENCODE_BATCH_SIZE, length) 모양의 forward 입력으로 만듭니다.
+    - 각 행은 pad 토큰으로 length까지 채우고, 행 수가 모자라면 마지막 행을 반복해 채웁니다.
+    - 워밍업과 실제 임베딩이 같은 함수를 거치므로 입력 모양/dtype이 항상 일치합니다.
+    """
+    rows = rows + [rows[-1]] * (ENCODE_BATCH_SIZE - len(rows))
+    pad_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else 0
+    input_ids = torch.full((ENCODE_BATCH_SIZE, length), pad_id, dtype=torch.long)
+    attention_mask = torch.zeros((ENCODE_BATCH_SIZE, length), dtype=torch.long)
+    for r, ids in enumerate(rows):
+        input_ids[r, :len(ids)] = torch.tensor(ids, dtype=torch.long)
+        attention_mask[r, :len(ids)] = 1
+    features = {"input_ids": input_ids.to(device), "attention_mask": attention_mask.to(device)}
+    if "token_type_ids" in tokenizer.model_input_names:
+        features["token_type_ids"] = torch.zeros_like(features["input_ids"])
+    return features
+
+
+def _compile_model(model: SentenceTransformer) -> SentenceTransformer:
+    """
+    트랜스포머 forward를 torch.compile(mode="reduce-overhead", dynamic=True)로 컴파일합니다.
+    - reduce-overhead는 입력 모양마다 CUDA 그래프를 따로 기록하므로, 컴파일된 모델은
+      `_encode_bucketed`로만 호출해 입력 모양을 (ENCODE_BATCH_SIZE, 길이 구간) 3가지로 고정합니다.
+    - 길이 구간별로 그 모양의 입력을 한 번씩 실행해 컴파일/CUDA 그래프 기록 비용을 기동 시점에 미리 지불합니다.
+    - 컴파일은 첫 호출 시점에 일어나므로, 워밍업이 실패하면 원래 모듈로 되돌리고 예외를 전달합니다.
+    """
+    auto_model = model[0].auto_model
+    model[0].auto_model = torch.compile(auto_model, mode="reduce-overhead", dynamic=True)
+    try:
+        tokenizer = model.tokenizer
+        filler_ids = tokenizer("warmup", add_special_tokens=False)["input_ids"]
+        for length in COMPILE_WARMUP_LENGTHS:
+            # [CLS] + 채움 토큰 (length - 2)개 + [SEP]
+            body = (filler_ids * (length - 2))[:length - 2]
+            row = [tokenizer.cls_token_id, *body, tokenizer.sep_token_id]
+            with torch.inference_mode():
+                model(_bucket_features(tokenizer, [row], length, model.device))
+    except Exception:
+        model[0].auto_model = auto_model
+        raise
+    return model
+
+
+def _encode_bucketed(model: SentenceTransformer, texts: List[str]) -> np.ndarray:
+    """
+    컴파일된 모델로 텍스트를 임베딩합니다. 모든 forward 입력이 워밍업한 모양 중 하나가 됩니다.
+    - 토큰 길이순으로 정렬해 ENCODE_BATCH_SIZE개씩 묶고, 배치를 가장 긴 문장이 들어가는 길이 구간까지 패딩합니다.
+    - 마지막 배치는 행을 반복해 ENCODE_BATCH_SIZE개로 채운 뒤, 결과에서 채운 행을 버립니다.
+    Args:
+        model: `_compile_model`로 컴파일된 모델
+        texts: 입력 텍스트 리스트
+    Returns:
+        (N, EMBED_DIM) 형태의 float32 정규화 벡터 배열 (입력 순서 유지)
+    """
+    tokenizer = model.tokenizer
+    token_ids = tokenizer(
+        texts, add_special_tokens=True, truncation=True, max_length=COMPILE_WARMUP_LENGTHS[-1]
+    )["input_ids"]
+    order = sorted(range(len(texts)), key=lambda i: len(token_ids[i]))
+    embeddings = np.empty((len(texts), EMBED_DIM), dtype=np.float32)
+    for start in range(0, len(order), ENCODE_BATCH_SIZE):
+        batch_idx = order[start:start + ENCODE_BATCH_SIZE]
+        rows = [token_ids[i] for i in batch_idx]
+        length = _bucket_length(max(len(r) for r in rows))
+        with torch.inference_mode():
+            out = model(_bucket_features(tokenizer, rows, length, model.device))["sentence_embedding"]
+            out = torch.nn.functional.normalize(out[:len(batch_idx)].float(), p=2, dim=1)
+        embeddings[batch_idx] = out.cpu().numpy()
+    return embeddings
+
+
+def _load_eng_model() -> SentenceTransformer:
+    """
+    실행 환경에 맞는 백엔드로 영어 임베딩 모델을 로드합니다.
+    - GPU: FP16 가중치로 로드해 텐서 코어 연산을 사용하고, torch.compile로 forward를 컴파일 (길이 구간 패딩으로 입력 모양 고정)
+    - CPU: ONNX Runtime 백엔드(EMBED_INT8이면 INT8 모델, 아니면 그래프 최적화된 O3 모델)를 사용하고,
+      로드에 실패하면 PyTorch 백엔드로 대체
+    - CPU PyTorch 백엔드: EMBED_INT8이면 INT8 동적 양자화 적용
+    Notes:
+        - 반환 벡터는 항상 float32로 변환해 Qdrant에 저장합니다.
+        - ONNX 백엔드는 sentence-transformers>=3.2와 optimum[onnxruntime]이 필요합니다.
+    """
+    global _eng_model_compiled
+    if torch.cuda.is_available():
+        model = SentenceTransformer(
+            ENG_MODEL_NAME,
+            device="cuda",
+            model_kwargs={"torch_dtype": torch.float16}
+        )
+        if USE_TORCH_COMPILE:
+            try:
+                model = _compile_model(model)
+                _eng_model_compiled = True
+            except Exception as e:
+                logging.warning("torch.compile 실패, 컴파일하지 않은 모델을 사용합니다: %s", str(e))
+        return model
+
+    if USE_ONNX_BACKEND:
+        for file_name in _onnx_file_names():
+            try:
+                return SentenceTransformer(
+                    ENG_MODEL_NAME,
+                    backend="onnx",
+                    model_kwargs={
+                        "file_name": file_name,
+                        "provider": "CPUExecutionProvider"
+                    }
+                )
+            except Exception as e:
+                logging.warning("ONNX 모델 %s 로드 실패: %s", file_name, str(e))
+        logging.warning("ONNX 백엔드 로드 실패, PyTorch 백엔드로 대체합니다.")
+
+    model = SentenceTransformer(ENG_MODEL_NAME)
+    if USE_INT8_QUANTIZATION:
+        try:
+            model = _quantize_int8(model)
+        except Exception as e:
+            logging.warning("INT8 양자화 실패, FP32 모델을 사용합니다: %s", str(e))
+    return model
+
+
+# CPU 추론 시 intra-op 스레드 수를 코어 수의 절반으로 제한 (요청 처리 스레드와의 경합 방지)
+if not torch.cuda.is_available():
+    torch.set_num_threads(max(1, (os.cpu_count() or 2) // 2))
+
+# 모델은 첫 임베딩 요청 시점에 로드합니다 (서버 기동 지연 및 워커별 메모리 점유 방지)
+_eng_model: Optional[SentenceTransformer] = None
+_eng_model_lock = threading.Lock()
+# torch.compile 적용 여부 (적용된 경우 `_encode_bucketed`로 고정 모양 입력만 사용)
+_eng_model_compiled = False
 
 
-# 영어 임베딩 모델
-eng_model = SentenceTransformer("all-MiniLM-L6-v2")  
+def _get_model() -> SentenceTransformer:
+    """
+    영어 임베딩 모델을 지연 로드하여 반환합니다 (프로세스당 1회 로드).
+    """
+    global _eng_model
+    if _eng_model is None:
+        with _eng_model_lock:
+            if _eng_model is None:
+                model = _load_eng_model()
+                model.eval()
+                _eng_model = model
+    return _eng_model
+
 
-# 모델의 hidden size를 벡터 차원으로 사용
-EMBED_DIM = eng_model.get_sentence_embedding_dimension()
+# all-MiniLM-L6-v2의 임베딩 차원 (모델 로드 없이 컬렉션을 만들 수 있도록 고정값 사용)
+EMBED_DIM = 384
+
+
+# Qdrant 업서트 1회에 보낼 최대 포인트 수
+UPSERT_BATCH_SIZE = 128
+
+# 양자화된 벡터로 후보를 2배수 찾은 뒤 원본(float32) 벡터로 재정렬하는 검색 옵션
+QUANTIZED_SEARCH_PARAMS = models.SearchParams(
+    quantization=models.QuantizationSearchParams(rescore=True, oversampling=2.0)
+)
+
+# 임베딩 캐시: blake2b(text) -> float32 벡터 (LRU, 최대 EMBED_CACHE_SIZE개)
+EMBED_CACHE_SIZE = 65536
+_embedding_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_embedding_cache_lock = threading.Lock()
 
 
 def get_collection_name(brain_id: str) -> str:
@@ -66,13 +300,17 @@ def initialize_collection(brain_id: str) -> None:
     """
     Qdrant에서 기존 컬렉션을 삭제하고 새로 생성합니다.
     - 기존 컬렉션이 있으면 삭제
-    - EMBED_DIM 크기, 코사인 거리 기준으로 새 컬렉션 생성
+    - EMBED_DIM 크기, 내적(DOT) 거리 기준으로 새 컬렉션 생성 (단위 벡터이므로 코사인과 동일)
+    - 벡터는 int8 스칼라 양자화 사본을 RAM에 유지 (원본은 재정렬용으로 보관)
+    - 대량 업서트 중 HNSW 그래프 갱신 비용을 피하기 위해 인덱스 구성을 지연(m=0)
+    - source_id payload에 keyword 인덱스 생성
     Args:
         brain_id: 브레인 고유 식별자
     Raises:
         RuntimeError: 생성 실패 시
     Notes:
         - 안전을 위해 항상 새로 생성합니다. 기존 인덱스 유지가 필요하면 호출 전 존재 여부를 확인하세요.
+        - 업서트가 끝나면 `finalize_index`를 호출해 HNSW 인덱스 구성을 활성화해야 합니다.
     """
     collection_name = get_collection_name(brain_id)
     # 기존 컬렉션 삭제 시도
@@ -87,8 +325,25 @@ def initialize_collection(brain_id: str) -> None:
             collection_name=collection_name,
             vectors_config=models.VectorParams(
                 size=EMBED_DIM,
-                distance=models.Distance.COSINE
+                # 저장/검색 벡터는 모두 정규화되어 있으므로 내적이 코사인 유사도와 같음
+                distance=models.Distance.DOT
+            ),
+            # int8 스칼라 양자화: 벡터 메모리/디스크 4배 절감, 검색 시 원본 벡터로 재정렬(rescore)
+            quantization_config=models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=True
+                )
             ),
+            hnsw_config=models.HnswConfigDiff(m=0),
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=0),
+        )
+        # source_id 필터(삭제/그룹 검색)가 전체 스캔을 하지 않도록 keyword 인덱스 생성
+        client.create_payload_index(
+            collection_name=collection_name,
+            field_name="source_id",
+            field_schema=models.PayloadSchemaType.KEYWORD,
         )
         logging.info("새 컬렉션 생성 완료: %s", collection_name)
     except Exception as e:
@@ -96,6 +351,108 @@ def initialize_collection(brain_id: str) -> None:
         raise RuntimeError(f"컬렉션 생성 실패: {str(e)}")
 
 
+def finalize_index(brain_id: str) -> None:
+    """
+    대량 업서트가 끝난 컬렉션의 HNSW 인덱스 구성을 활성화합니다.
+    - initialize_collection에서 지연시킨 그래프 구성(m=0)을 m=16으로 되돌립니다.
+    Args:
+        brain_id: 브레인 고유 식별자
+    Notes:
+        - 인덱스가 없어도 검색은 전체 스캔으로 동작하므로, 실패 시 경고만 남깁니다.
+    """
+    collection_name = get_collection_name(brain_id)
+    try:
+        client.update_collection(
+            collection_name=collection_name,
+            hnsw_config=models.HnswConfigDiff(m=16),
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=20000),
+        )
+        logging.info("HNSW 인덱스 구성 활성화: %s", collection_name)
+    except Exception as e:
+        logging.warning("컬렉션 %s 인덱스 활성화 실패: %s", collection_name, str(e))
+
+
+def _point_id(key: str) -> str:
+    """
+    키 문자열의 blake2b 128비트 다이제스트로 Qdrant 포인트 UUID를 생성합니다.
+    - 파이썬 hash()와 달리 실행마다 값이 같으므로, 같은 내용의 재업서트가 기존 포인트를 덮어씁니다.
+    """
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+    return str(uuid.UUID(bytes=digest))
+
+
+def _upsert_points(collection_name: str, points: List[models.PointStruct]) -> None:
+    """
+    포인트 목록을 UPSERT_BATCH_SIZE 단위로 묶어 Qdrant에 업서트합니다.
+    - 중간 배치는 wait=False로 전송하고, 마지막 배치만 wait=True로 전송해 반영 대기를 한 번만 수행합니다.
+    Args:
+        collection_name: 대상 컬렉션 이름
+        points: 업서트할 PointStruct 리스트
+    """
+    for start in range(0, len(points), UPSERT_BATCH_SIZE):
+        is_last = start + UPSERT_BATCH_SIZE >= len(points)
+        client.upsert(
+            collection_name=collection_name,
+            points=points[start:start + UPSERT_BATCH_SIZE],
+            wait=is_last
+        )
+
+
+def _encode_with_cache(texts: List[str]) -> np.ndarray:
+    """
+    텍스트 리스트를 한 번의 배치 호출로 임베딩하되, 이미 임베딩한 텍스트는 캐시에서 가져옵니다.
+    - 캐시 키는 blake2b(text) 해시이며, 캐시 미스만 모델에 전달합니다.
+    - 같은 호출 안에서 중복된 텍스트도 한 번만 임베딩합니다.
+    Args:
+        texts: 입력 텍스트 리스트
+    Returns:
+        (N, EMBED_DIM) 형태의 float32 정규화 벡터 배열
+    """
+    keys = [hashlib.blake2b(t.encode("utf-8"), digest_size=16).hexdigest() for t in texts]
+    embeddings = np.empty((len(texts), EMBED_DIM), dtype=np.float32)
+
+    miss_positions: Dict[str, int] = {}  # 캐시 키 -> miss_texts 내 위치
+    miss_texts: List[str] = []
+    with _embedding_cache_lock:
+        for i, key in enumerate(keys):
+            cached = _embedding_cache.get(key)
+            if cached is not None:
+                _embedding_cache.move_to_end(key)
+                embeddings[i] = cached
+            elif key not in miss_positions:
+                miss_positions[key] = len(miss_texts)
+                miss_texts.append(texts[i])
+
+    if not miss_texts:
+        return embeddings
+
+    model = _get_model()
+    if _eng_model_compiled:
+        new_embeddings = _encode_bucketed(model, miss_texts)
+    else:
+        # inference_mode는 no_grad와 달리 버전 카운터/뷰 추적까지 생략합니다
+        with torch.inference_mode():
+            new_embeddings = np.atleast_2d(model.encode(
+                miss_texts,
+                batch_size=ENCODE_BATCH_SIZE,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )).astype(np.float32)
+
+    for i, key in enumerate(keys):
+        if key in miss_positions:
+            embeddings[i] = new_embeddings[miss_positions[key]]
+
+    with _embedding_cache_lock:
+        for key, pos in miss_positions.items():
+            _embedding_cache[key] = new_embeddings[pos].copy()
+        while len(_embedding_cache) > EMBED_CACHE_SIZE:
+            _embedding_cache.popitem(last=False)
+
+    return embeddings
+
+
 def encode_text(text: str) -> List[float]:
     """
     주어진 텍스트를 SentenceTransformer 모델로 임베딩하여 벡터 반환
@@ -112,55 +469,29 @@ def encode_text(text: str) -> List[float]:
         - 배치 추론을 고려하면 처리량이 증가하지만, 여기서는 단일 텍스트 기준으로 구현되어 있습니다.
     """
     try:
-        embedding = eng_model.encode(text, convert_to_numpy=True, normalize_embeddings=True)
-        return embedding.tolist()
+        return _encode_with_cache([text])[0].tolist()
     except Exception as e:
         logging.error("텍스트 임베딩 생성 실패: %s", str(e))
         raise RuntimeError(f"텍스트 임베딩 생성 실패: {str(e)}")
 
 
-def get_embeddings_batch(texts: List[str], lang:str) -> np.ndarray:
+def get_embeddings_batch(texts: List[str]) -> np.ndarray:
     """
-    Embeds the given list of texts using the model appropriate for the language and returns it as a numpy array.
-    Ensures the return value is always a 2D numpy array with shape (N, D).
+    Embeds the given list of texts with the English model and returns it as a numpy array.
+    Ensures the return value is always a 2D float32 numpy array with shape (N, D).
     """
-    lang="en"
-
-    # ---- Korean Embedding ----
-    if lang == "ko":
-        inputs = tokenizer(
-            texts, return_tensors="pt", padding=True, truncation=True, max_length=512
-        )
-        with torch.no_grad():
-            outputs = model(**inputs)
-        cls_embeddings = outputs.last_hidden_state[:, 0, :]  # [CLS] token
-        embeddings = cls_embeddings.cpu().numpy()
-
-    # ---- English Embedding ----
-    elif lang == "en":
-        embeddings = eng_model.encode(
-            texts, convert_to_numpy=True, normalize_embeddings=True
-        )
-
-    else:
-        raise ValueError(f"Unsupported language code: {lang}")
-
-    # ---- Force shape correction ----
-    embeddings = np.atleast_2d(embeddings)  # Always maintain 2D shape
-    return embeddings
-
-def store_embeddings(node:dict, brain_id:str, embeddings:list):
-
-    lang="en"
-    collection_name = get_collection_name(brain_id)
+    return np.atleast_2d(_encode_with_cache(texts))
 
+def _node_points(node:dict, embeddings:list) -> List[models.PointStruct]:
+    """Builds the Qdrant points of one node (one point per description) without upserting them."""
     if embeddings is None or embeddings.size == 0: 
         length = 0
 
     else:
         length=len(embeddings)
 
-
+    vectors = []
+    payloads = []
     for idx, desc in enumerate(node["descriptions"]):
         description=desc["description"]
         source_id=node["source_id"]
@@ -169,7 +500,7 @@ def store_embeddings(node:dict, brain_id:str, embeddings:list):
         if description == "":
             try:
                 description = node["name"]
-                emb = get_embeddings_batch([description], lang)
+                emb = get_embeddings_batch([description])
                 if emb is None or emb.size == 0:
                     logging.warning("Failed to generate embedding: %s", description)
                     continue
@@ -180,42 +511,116 @@ def store_embeddings(node:dict, brain_id:str, embeddings:list):
         else:
             if embeddings is None or embeddings.size == 0:  # Check for empty list
                 highlighted_description = description.replace(phrase, f"[{phrase}]")
-                emb = get_embeddings_batch([highlighted_description], lang)
+                emb = get_embeddings_batch([highlighted_description])
                 emb = emb[0] if emb.ndim > 1 else emb
             else:
                 if length > idx:
-                    emb = np.array(embeddings[idx])
+                    # Keep the precomputed row as a float32 view (no per-point copy)
+                    emb = np.asarray(embeddings[idx], dtype=np.float32)
                     if emb.ndim > 1:
                         emb = emb[0]
 
                 else:
                     break
 
-        
-        desc_hash = str(hash(description)) if description else "empty"
-        pid = str(uuid.uuid5(uuid.NAMESPACE_DNS, f"{source_id}_{desc_hash}"))
-        
-        # Upsert to Qdrant (with exception handling)
+        pid = _point_id(f"{source_id}_{description}")
+        vectors.append(emb)
+        payloads.append({
+            "source_id": source_id,
+            "name": phrase,
+            "description": description,
+            "point_id": pid
+        })
+
+    if not vectors:
+        return []
+    # Convert the stacked float32 matrix to Python lists in one bulk call
+    rows = np.vstack(vectors).tolist()
+    return [
+        models.PointStruct(id=payload["point_id"], vector=row, payload=payload)
+        for row, payload in zip(rows, payloads)
+    ]
+
+def store_embeddings(node:dict, brain_id:str, embeddings:list):
+
+    collection_name = get_collection_name(brain_id)
+
+    # Upsert all points of the node at once (with exception handling)
+    try:
+        points = _node_points(node, embeddings)
+        if points:
+            _upsert_points(collection_name, points)
+    except Exception as e:
+        logging.error("Qdrant upsert failed (node: %s): %s", node.get("source_id", "unknown"), str(e))
+
+def store_node_embeddings(items: List[tuple], brain_id: str) -> None:
+    """
+    Upserts the points of many nodes with a single Qdrant call.
+    Each item is a (node, embeddings) pair, as passed to `store_embeddings(node, brain_id, embeddings)`.
+    """
+    collection_name = get_collection_name(brain_id)
+
+    points = []
+    for node, embeddings in items:
         try:
-            vector_as_list = emb.tolist()
-            client.upsert(
-                collection_name=collection_name,
-                points=[
-                    models.PointStruct(
-                        id=pid,
-                        vector=vector_as_list,
-                        payload={
-                            "source_id": source_id,
-                            "name": phrase,
-                            "description": description,
-                            "point_id": pid
-                        }
-                    )
-                ]
-            )
+            points.extend(_node_points(node, embeddings))
         except Exception as e:
-            logging.error("Qdrant upsert failed (node: %s, idx: %d): %s", source_id, idx, str(e))
-    
+            logging.error("Failed to build points (node: %s): %s", node.get("name", "unknown"), str(e))
+
+    if not points:
+        return
+    try:
+        _upsert_points(collection_name, points)
+    except Exception as e:
+        logging.error("Qdrant upsert failed (nodes: %d, points: %d): %s", len(items), len(points), str(e))
+
+def store_embeddings_batch(nodes: List[Dict], brain_id: str) -> None:
+    """
+    Embeds the descriptions of many nodes with a single model call and upserts them together.
+    Produces the same points as calling `store_embeddings(node, brain_id, None)` for each node:
+    - Empty description: the node name is embedded and stored as the description
+    - Otherwise: the description with the node name highlighted as [name] is embedded
+    """
+    collection_name = get_collection_name(brain_id)
+
+    texts = []
+    payloads = []
+    for node in nodes:
+        source_id = node["source_id"]
+        phrase = node["name"]
+        for desc in node["descriptions"]:
+            description = desc["description"]
+            if description == "":
+                description = phrase
+                texts.append(description)
+            else:
+                texts.append(description.replace(phrase, f"[{phrase}]"))
+            payloads.append({
+                "source_id": source_id,
+                "name": phrase,
+                "description": description,
+                "point_id": _point_id(f"{source_id}_{description}")
+            })
+
+    if not texts:
+        return
+
+    try:
+        embeddings = get_embeddings_batch(texts)
+    except Exception as e:
+        logging.error("Error during batch embedding generation (%d texts): %s", len(texts), str(e))
+        return
+
+    try:
+        rows = np.asarray(embeddings, dtype=np.float32).tolist()
+        points = [
+            models.PointStruct(id=payload["point_id"], vector=row, payload=payload)
+            for row, payload in zip(rows, payloads)
+        ]
+        _upsert_points(collection_name, points)
+    except Exception as e:
+        logging.error("Qdrant upsert failed (nodes: %d, points: %d): %s", len(nodes), len(texts), str(e))
+
 def update_index_and_get_embeddings(nodes: List[Dict], brain_id: str) -> Dict[str, List[List[float]]]:
     """
     Embeds a list of nodes into various representation formats and saves them to Qdrant
@@ -223,9 +628,10 @@ def update_index_and_get_embeddings(nodes: List[Dict], brain_id: str) -> Dict[st
     Processing Order:
     1. Validate required fields (source_id, name, descriptions)
     2. Apply conditional formatting based on the presence of a description
-    3. Embed using encode_text
-    4. Generate point_id using uuid5
-    5. Save vector and payload using Qdrant upsert
+    3. Collect every formatted text across all nodes into a single list
+    4. Embed the list in UPSERT_BATCH_SIZE batches (texts already embedded are served from the cache)
+    5. Generate a deterministic point_id from a blake2b digest
+    6. Hand each batch of points to a background worker that upserts it while the next batch is embedded
 
     Args:
         nodes: List of nodes containing {source_id, name, descriptions}
@@ -235,6 +641,7 @@ def update_index_and_get_embeddings(nodes: List[Dict], brain_id: str) -> Dict[st
     Notes:
         - If description is empty, embeddings are generated using only the name.
         - Multiple vectors can be generated for different formats from the same node.
+        - SentenceTransformer sorts the batch by length internally, so padding per mini-batch stays small.
         - Internal steps are wrapped in try/except and logged for exception robustness.
     """
     collection_name = get_collection_name(brain_id)
@@ -246,6 +653,10 @@ def update_index_and_get_embeddings(nodes: List[Dict], brain_id: str) -> Dict[st
         "{description}"
     ]
 
+    # Pass 1: collect the texts to embed and the metadata needed to build each point
+    texts: List[str] = []
+    meta: List[tuple] = []  # (source_id, name, description, format_index)
+
     for node in nodes:
         try:
             # Check for required keys
@@ -255,107 +666,132 @@ def update_index_and_get_embeddings(nodes: List[Dict], brain_id: str) -> Dict[st
 
             source_id = str(node["source_id"])
             name = str(node.get("name", "")).strip()
-            
+
             # Check for empty name
             if not name:
                 logging.warning("Empty name field: %s", source_id)
                 continue
 
-            embeddings_for_node: List[List[float]] = []
+            num_texts = len(texts)
 
-            # Generate vectors for each format per description
+            # Generate texts for each format per description
             for desc in node["descriptions"]:
-                try:
-                    # Extract description
-                    if isinstance(desc, dict):
-                        description = (desc.get("description") or "").strip()
-                    else:
-                        description = str(desc).strip()
+                # Extract description
+                if isinstance(desc, dict):
+                    description = (desc.get("description") or "").strip()
+                else:
+                    description = str(desc).strip()
+
+                # If description exists, use both formats; otherwise only the first one (effectively just the name)
+                active_formats = formats if description else [formats[0]]
 
-                    # Select formats based on description presence
+                for idx, fmt in enumerate(active_formats):
                     if description:
-                        # If description exists, use both formats
-                        active_formats = formats
+                        text = fmt.format(name=name, description=description).strip()
                     else:
-                        # If description is empty, use only the first format (effectively just the name)
-                        active_formats = [formats[0]]  # "{name} {description}"
-
-                    for idx, fmt in enumerate(active_formats):
-                        try:
-                            # Generate text
-                            if description:
-                                text = fmt.format(name=name, description=description).strip()
-                            else:
-                                # If description is empty, use only the name
-                                text = name.strip()
-                            
-                            # Check minimum length
-                            if len(text) < 1:
-                                logging.debug("Skipping empty text: %s", text)
-                                continue
-                                
-                            logging.info("[Embedding Text] %s", text)
-
-                            # Generate embedding (with exception handling)
-                            try:
-                                emb = encode_text(text)
-                                if not emb or len(emb) == 0:
-                                    logging.warning("Failed to generate embedding: %s", text)
-                                    continue
-                            except Exception as e:
-                                logging.error("Error during embedding generation: %s - %s", text, str(e))
-                                continue
-
-                            embeddings_for_node.append(emb)
-
-                            # Generate unique point_id (using hash to limit length)
-                            desc_hash = str(hash(description)) if description else "empty"
-                            pid = str(uuid.uuid5(uuid.NAMESPACE_DNS, f"{source_id}_{idx}_{desc_hash}"))
-
-                            # Upsert to Qdrant (with exception handling)
-                            try:
-                                client.upsert(
-                                    collection_name=collection_name,
-                                    points=[
-                                        models.PointStruct(
-                                            id=pid,
-                                            vector=emb,
-                                            payload={
-                                                "source_id": source_id,
-                                                "name": name,
-                                                "description": description,
-                                                "format_index": idx,
-                                                "point_id": pid
-                                            }
-                                        )
-                                    ]
-                                )
-                                logging.info("Node %s descriptor %d saved successfully (UUID: %s)", source_id, idx, pid)
-                            except Exception as e:
-                                logging.error("Qdrant upsert failed (node: %s, idx: %d): %s", source_id, idx, str(e))
-                                continue
-
-                        except Exception as e:
-                            logging.error("Error processing format %d (node: %s): %s", idx, source_id, str(e))
-                            continue
-                            
-                except Exception as e:
-                    logging.error("Error processing description (node: %s): %s", source_id, str(e))
-                    continue
+                        text = name
 
-            if embeddings_for_node:
-                all_embeddings[source_id] = embeddings_for_node
-            else:
+                    # Check minimum length
+                    if len(text) < 1:
+                        logging.debug("Skipping empty text: %s", text)
+                        continue
+
+                    logging.info("[Embedding Text] %s", text)
+                    texts.append(text)
+                    meta.append((source_id, name, description, idx))
+
+            if len(texts) == num_texts:
                 logging.warning("No embeddings generated for node %s", source_id)
-                
+
         except Exception as e:
             logging.error("Error processing entire node %s: %s", node.get("source_id", "unknown"), str(e))
             continue
 
+    if not texts:
+        logging.info("Saved 0 node embeddings to collection %s", collection_name)
+        return all_embeddings
+
+    # Pass 2: embed the texts batch by batch on this thread while a background worker
+    # upserts the previous batch, so encoding (CPU/GPU) and upserting (I/O) overlap
+    point_batches: "queue.Queue[Optional[List[models.PointStruct]]]" = queue.Queue(maxsize=4)
+
+    def upsert_batch(points: List[models.PointStruct], wait: bool) -> None:
+        try:
+            client.upsert(collection_name=collection_name, points=points, wait=wait)
+        except Exception as e:
+            logging.error("Qdrant upsert failed (collection: %s, points: %d): %s", collection_name, len(points), str(e))
+
+    def upsert_worker() -> None:
+        # Each batch is held back by one: intermediate batches go out with wait=False and only
+        # the final batch waits, so the apply wait happens once (same as `_upsert_points`)
+        held: Optional[List[models.PointStruct]] = None
+        while True:
+            points = point_batches.get()
+            if points is None:
+                if held:
+                    upsert_batch(held, wait=True)
+                return
+            if held:
+                upsert_batch(held, wait=False)
+            held = points
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        consumer = executor.submit(upsert_worker)
+        try:
+            for start in range(0, len(texts), UPSERT_BATCH_SIZE):
+                end = start + UPSERT_BATCH_SIZE
+                try:
+                    embeddings = _encode_with_cache(texts[start:end])
+                except Exception as e:
+                    logging.error("Error during batch embedding generation (%d texts): %s", len(texts[start:end]), str(e))
+                    continue
+
+                # Scatter the embeddings back to their nodes and build the points to upsert
+                points: List[models.PointStruct] = []
+                # Convert the float32 matrix to Python lists in one bulk call instead of per row
+                for (source_id, name, description, idx), vector in zip(meta[start:end], embeddings.tolist()):
+                    all_embeddings.setdefault(source_id, []).append(vector)
+
+                    # Generate a deterministic point_id so re-indexing overwrites instead of duplicating
+                    pid = _point_id(f"{source_id}_{idx}_{description}")
+
+                    points.append(
+                        models.PointStruct(
+                            id=pid,
+                            vector=vector,
+                            payload={
+                                "source_id": source_id,
+                                "name": name,
+                                "description": description,
+                                "format_index": idx,
+                                "point_id": pid
+                            }
+                        )
+                    )
+                point_batches.put(points)
+        finally:
+            # Tell the worker there are no more batches and wait for the last upsert
+            point_batches.put(None)
+        consumer.result()
+
+    # Bulk load is done; build the HNSW graph now
+    finalize_index(brain_id)
+
     logging.info("Saved %d node embeddings to collection %s", len(all_embeddings), collection_name)
     return all_embeddings
 
 
+def _to_node_entry(payload: Dict, score: float) -> Dict:
+    """Qdrant 검색 결과의 payload와 점수를 노드 검색 결과 항목으로 변환합니다."""
+    return {
+        "source_id": payload.get("source_id", ""),
+        "point_id": payload.get("point_id", ""),
+        "name": payload.get("name", ""),
+        "description": payload.get("description", ""),
+        "score": score
+    }
+
+
 def search_similar_nodes(
     embedding: List[float],
     brain_id: str,
@@ -367,11 +803,10 @@ def search_similar_nodes(
     Qdrant에서 유사 벡터 검색 후 source_id별 필터링
 
     로직:
-    1. 검색 결과에서 threshold 미만 제거
-    2. high_score_threshold 이상은 모두 high_scores에 저장
-    3. 나머지는 source_id별 최고 점수로 그룹핑
-    4. 그룹핑 결과 상위 limit개 선택
-    5. high_scores + 상위 limit 반환
+    1. high_score_threshold 이상 결과는 name별 최고 점수로 모두 high_scores에 저장
+    2. threshold 이상 결과는 Qdrant `search_groups`로 name별 최고 점수 1개씩 그룹핑
+    3. high_scores에 없는 그룹 중 상위 limit개 선택
+    4. high_scores + 상위 limit 반환
 
     Args:
         embedding: 검색할 임베딩 벡터
@@ -388,56 +823,43 @@ def search_similar_nodes(
     collection_name = get_collection_name(brain_id)
 
     try:
-        # 검색: 충분히 많은 후보 요청 (limit * 10)
-        #   Qdrant에 query_vector와 유사도가 높은 순으로 상위 limit*10개 만큼 요청
-        #   예: limit=10 -> 상위 100개(0.8 이상이든 0.5~0.8 사이든 무조건 top100 가져옴)
-        #   이후 threshold 필터링 및 source_id 그룹핑 수행
-        search_results = client.search(
+        # 1) 고유사도 구간: high_score_threshold 이상 후보를 모두 요청 (최대 limit * 10개)
+        #    결과는 점수 내림차순이므로 name별 첫 항목이 최고 점수
+        high_results = client.search(
             collection_name=collection_name,
             query_vector=embedding,
-            limit=limit * 10
+            limit=limit * 10,
+            score_threshold=high_score_threshold,
+            search_params=QUANTIZED_SEARCH_PARAMS
         )
 
         high_score_group: Dict[str, Dict] = {}
-        grouped_by_name: Dict[str, Dict] = {}
-
-        for result in search_results:
-            score = result.score
-            if score < threshold:
-                # 임계값 미만 결과 스킵
-                continue
-
+        for result in high_results:
             payload = result.payload or {}
-            sid = payload.get("source_id", "")
             name = payload.get("name", "")
+            if name not in high_score_group:
+                high_score_group[name] = _to_node_entry(payload, result.score)
 
-            entry = {
-                "source_id": sid,
-                "point_id": payload.get("point_id", ""),
-                "name": payload.get("name", ""),
-                "description": payload.get("description", ""),
-                "score": score
-            }
-
-            if score >= high_score_threshold:
-                # 고유사도 항목은 모두 무제한 수집
-                if name not in high_score_group or score > high_score_group[name]["score"]:
-                    high_score_group[name] = entry
-            else:
-                if name not in grouped_by_name or score > grouped_by_name[name]["score"]:
-                    grouped_by_name[name] = entry
+        # 2) 일반 구간: Qdrant 서버 측에서 name별 최고 점수 1개씩 그룹핑
+        #    고유사도 name과 겹치는 그룹을 제외해도 limit개가 남도록 그만큼 더 요청
+        groups = client.search_groups(
+            collection_name=collection_name,
+            query_vector=embedding,
+            group_by="name",
+            limit=limit + len(high_score_group),
+            group_size=1,
+            score_threshold=threshold,
+            search_params=QUANTIZED_SEARCH_PARAMS
+        ).groups
 
-        
         # high_score_group은 무조건 포함, grouped는 limit 만큼 점수 내림차순으로
+        # 중복 제거: high_score_group에 있는 name은 grouped에서 제외
         high_scores = list(high_score_group.values())
-        grouped = sorted(grouped_by_name.values(), key=lambda x: -x["score"])
-
-         # 중복 제거: high_scores에 있는 name은 grouped에서 제외
-        high_score_names = {entry["name"] for entry in high_scores}
-        filtered_grouped = [entry for entry in grouped if entry["name"] not in high_score_names]
-
-        # limit 만큼 제한
-        top_grouped = filtered_grouped[:limit]
+        top_grouped = [
+            _to_node_entry(group.hits[0].payload or {}, group.hits[0].score)
+            for group in groups
+            if group.id not in high_score_group
+        ][:limit]
 
         final_nodes = high_scores + top_grouped
 
@@ -471,14 +893,17 @@ def is_index_ready(brain_id: str) -> bool:
         return False
 
 
-def delete_node(source_id: str, brain_id: str) -> None:
+def delete_node(source_ids: List[str], brain_id: str) -> None:
     """벡터 데이터베이스에서 노드를 삭제합니다.
+    - 여러 source_id를 MatchAny 필터 하나로 묶어 한 번의 삭제 요청으로 처리
     Args:
-        source_id: 노드의 고유 식별자
+        source_ids: 삭제할 노드(소스)의 고유 식별자 목록
         brain_id: 브레인의 고유 식별자
     Raises:
         RuntimeError: 삭제 실패 시
     """
+    if not source_ids:
+        return
     collection_name = get_collection_name(brain_id)
     try:
         # source_id를 payload 필터로 사용하여 모든 관련 벡터 삭제
@@ -489,15 +914,15 @@ def delete_node(source_id: str, brain_id: str) -> None:
                     must=[
                         models.FieldCondition(
                             key="source_id",
-                            match=models.MatchValue(value=source_id)
+                            match=models.MatchAny(any=list(source_ids))
                         )
                     ]
                 )
             )
         )
-        logging.info("컬렉션 %s에서 source_id %s의 모든 벡터 삭제 완료", collection_name, source_id)
+        logging.info("컬렉션 %s에서 source_id %s의 모든 벡터 삭제 완료", collection_name, source_ids)
     except Exception as e:
-        logging.error("노드 %s 삭제 실패: %s", source_id, str(e))
+        logging.error("노드 %s 삭제 실패: %s", source_ids, str(e))
         raise RuntimeError(f"노드 삭제 실패: {str(e)}")
 
 
@@ -542,44 +967,36 @@ def search_similar_descriptions(
     collection_name = get_collection_name(brain_id)
     
     try:
-        # 검색 실행
-        search_results = client.search(
+        # 검색 실행: Qdrant 서버 측에서 source_id별 최고 점수 문장 1개씩 그룹핑해 정확히 limit개만 받음
+        groups = client.search_groups(
             collection_name=collection_name,
             query_vector=embedding,
-            limit=limit * 5  # 중복 제거를 위해 더 많은 결과를 가져옴
-        )
-        
+            group_by="source_id",
+            limit=limit,
+            group_size=1,
+            score_threshold=threshold,
+            search_params=QUANTIZED_SEARCH_PARAMS
+        ).groups
+
         # 결과 처리
-        seen_source_ids = set()
         results = []
-        
-        for result in search_results:
-            if result.score < threshold:
-                continue
-                
-            payload = result.payload or {}
-            source_id = payload.get("source_id", "")
+        for group in groups:
+            hit = group.hits[0]
+            payload = hit.payload or {}
+            source_id = payload.get("source_id", group.id)
             description = payload.get("description", "")
-            
-            # 이미 처리한 source_id는 스킵
-            if source_id in seen_source_ids:
-                continue
-                
-            seen_source_ids.add(source_id)
+
             results.append({
                 "source_id": source_id,
                 "description": description,
-                "score": result.score
+                "score": hit.score
             })
-            
+
             # 유사도 점수 로깅
-            logging.info(f"유사 문장 발견 - ID: {source_id}, 유사도: {result.score:.4f}, 내용: {description[:100]}...")
-            
-            if len(results) >= limit:
-                break
-                
+            logging.info(f"유사 문장 발견 - ID: {source_id}, 유사도: {hit.score:.4f}, 내용: {description[:100]}...")
+
         return results
-        
+
     except Exception as e:
         logging.error("유사 문장 검색 실패: %s", str(e))
         raise RuntimeError(f"유사 문장 검색 실패: {str(e)}")
@@ -8,7 +8,7 @@ to generate keyword nodes/edges.
 
 Component Overview:
 - `extract_keywords_by_tfidf`: Extracts top TF-IDF keywords from each chunk's tokens
-- `lda_keyword_and_similarity`: Estimates full/partial topics via LDA and calculates the topic distribution similarity matrix
+- `lda_keyword_and_similarity`: Estimates full/partial topics via LDA and calculates the topic distribution similarity of consecutive sentences
 - `recurrsive_chunking`: Similarity-based recursive chunking (considers termination conditions/depth/token count, etc.)
 - `extract_graph_components`: Executes the entire pipeline -> Builds nodes/edges
 - `manual_chunking`: Returns only chunking results for source-less (-1) cases
@@ -19,42 +19,108 @@ Notes:
 """
 
 import logging
+import math
+import os
 import re
+import time
 from gensim import corpora, models
-from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.feature_extraction.text import TfidfVectorizer
 import numpy as np
-from collections import defaultdict
+from collections import Counter, defaultdict
 from .node_gen_ver5 import _extract_from_chunk
 from .node_gen_ver5 import split_into_tokenized_sentence
-from .node_gen_ver5 import store_embeddings
+from .embedding_service import store_embeddings_batch
 
 stopwords_en= [
     "the", "an", "which", "they", "this", "you", "me", "I"
 ]
 
+# LDA training budget: the whole corpus is one chunk, so every pass is exactly one model update
+# (gensim warns that training may not converge below 10 updates, so 10 passes is the minimum)
+LDA_PASSES = 10
+LDA_ITERATIONS = 100
+# Texts with at least this many sentences are trained with LdaMulticore (if more than one worker core is available)
+LDA_MULTICORE_MIN_SENTENCES = 500
+# Texts with fewer sentences than this (2 x the 5 LDA topics) skip LDA and use the TF-IDF similarity path
+LDA_MIN_SENTENCES = 10
+# Vocabulary size of the TF-IDF vectorizer shared by keyword extraction and final-chunk scoring
+SHARED_TFIDF_MAX_FEATURES = 5000
+# Number of ranked keywords gen_node_edges_for_new_groups asks for per group before falling back to the full list
+TOPIC_CANDIDATES = 20
+_STOPWORDS_EN = frozenset(stopwords_en)
+# Root keyword/sentence similarity source for recursive chunking:
+# true = LDA topic distributions, false = TF-IDF vectors of the shared vectorizer (no model training)
+USE_LDA_SIMILARITY = os.getenv("CHUNK_USE_LDA", "true").lower() in ("1", "true", "yes")
+
+
+def _keyword_analyzer(tokens: list[str]) -> list[str]:
+    """Analyzer for already tokenized input: only drops stop words."""
+    return [t for t in tokens if t not in _STOPWORDS_EN]
+
+
+def _new_keyword_vectorizer(max_features: int = 1000) -> TfidfVectorizer:
+    """Creates the TfidfVectorizer used for per-chunk keyword extraction."""
+    # A callable analyzer replaces the preprocessor -> tokenizer -> stop word pipeline with one call per document
+    # (sklearn ignores stop_words for callable analyzers, so they are filtered in _keyword_analyzer)
+    return TfidfVectorizer(
+        analyzer=_keyword_analyzer,
+        max_features=max_features,
+        norm="l2",
+        dtype=np.float32,          # Scores are only ranked/compared, float32 halves the sparse data buffers
+        token_pattern=None,        # Prevent warning
+        lowercase=False            # Input is already tokenized and normalized
+    )
+
 
-def extract_keywords_by_tfidf(tokenized_chunks: list[list[str]]):
+def fit_keyword_vectorizer(sentence_tokens: list[list[str]]):
+    """Fits one keyword vectorizer on the sentences of the whole text.
+
+    The vocabulary and IDF are computed once (each sentence is treated as a document)
+    and reused by `extract_keywords_by_tfidf` at every recursion depth and by
+    `all_chunks_tf_idf_` for the final chunks.
+
+    Args:
+        sentence_tokens: The token list of every sentence of the whole text.
+
+    Returns:
+        A fitted TfidfVectorizer, or None if the text has no usable vocabulary.
+    """
+    vectorizer = _new_keyword_vectorizer(SHARED_TFIDF_MAX_FEATURES)
+    try:
+        vectorizer.fit(sentence_tokens)
+    except ValueError as e:
+        # Case where all sentences consist of stop words or are empty
+        if "empty vocabulary" in str(e):
+            return None
+        raise e
+    # get_feature_names_out() re-sorts the whole vocabulary on every call, so resolve it once here
+    vectorizer.keyword_feature_names_ = np.asarray(vectorizer.get_feature_names_out())
+    return vectorizer
+
+
+def extract_keywords_by_tfidf(tokenized_chunks: list[list[str]], vectorizer: TfidfVectorizer = None, top_n: int = None):
        """Extracts top TF-IDF keywords from a list of tokenized chunks.
    
        Args:
            tokenized_chunks: A list of token lists for each group.
+           vectorizer: A vectorizer already fitted on the whole text (see `fit_keyword_vectorizer`).
+               If not provided, a new one is fitted on tokenized_chunks.
+           top_n: If given, only the top_n keywords of each group are ranked and returned.
    
        Returns:
            all_sorted_keywords: A list of keyword lists for each group.
        """
-       # 1. Define Vectorizer
-       vectorizer = TfidfVectorizer(
-           stop_words=stopwords_en,
-           max_features=1000,
-           tokenizer=lambda x: x,      # Use the input (token list) as is
-           preprocessor=lambda x: x,  # Skip preprocessing
-           token_pattern=None,        # Prevent warning
-           lowercase=False            # Prevents 'list' object has no attribute 'lower' error when skipping preprocessing/tokenization
-       )
-       # 2. Calculate TF-IDF
+       # Nothing to score: skip the vectorizer entirely
+       if all(len(c) == 0 for c in tokenized_chunks):
+           return [[] for _ in tokenized_chunks]
+
+       # 1-2. Calculate TF-IDF (reuse the shared vocabulary/IDF when available)
        try:
-           tfidf_matrix = vectorizer.fit_transform(tokenized_chunks)
+           if vectorizer is not None:
+               tfidf_matrix = vectorizer.transform(tokenized_chunks)
+           else:
+               vectorizer = _new_keyword_vectorizer()
+               tfidf_matrix = vectorizer.fit_transform(tokenized_chunks)
        except ValueError as e:
            # Case where all documents consist of stop words or are empty, resulting in an empty vocabulary
            if "empty vocabulary" in str(e):
@@ -62,75 +128,89 @@ def extract_keywords_by_tfidf(tokenized_chunks: list[list[str]]):
            else:
                raise e
    
-       feature_names = vectorizer.get_feature_names_out()
+       # Wrap in an ndarray so a whole row of column indices can be looked up at once
+       # (a shared vectorizer already carries the resolved names, see `fit_keyword_vectorizer`)
+       feature_names = getattr(vectorizer, "keyword_feature_names_", None)
+       if feature_names is None:
+           feature_names = np.asarray(vectorizer.get_feature_names_out())
+       # fit_transform/transform already return CSR; tocsr() is a no-op safeguard
+       csr = tfidf_matrix.tocsr()
    
        # 3. Sort keywords by group
+       # Read the CSR buffers once; scores are negated once for the whole matrix for descending sorts
+       indptr = csr.indptr.tolist()
+       indices = csr.indices
+       neg_data = -csr.data
        all_sorted_keywords = []
-       for i in range(tfidf_matrix.shape[0]):
-           row = tfidf_matrix[i].toarray().flatten()
+       for i in range(csr.shape[0]):
+           # Only the nonzero entries of the row are stored, so words with a score of 0 are already excluded
+           start, end = indptr[i], indptr[i + 1]
+           cols = indices[start:end]
+           neg = neg_data[start:end]
    
-           # Sort indices in descending order of TF-IDF score
-           sorted_indices = row.argsort()[::-1]
-   
-           # Add 'all' keywords with a score greater than 0, in order
-           sorted_keywords = [
-               feature_names[j] 
-               for j in sorted_indices  # Removed top_n slicing
-               if row[j] > 0            # Exclude words with a score of 0
-           ]
+           # Sort in descending order of TF-IDF score ('all' keywords unless top_n is given)
+           if top_n is not None and neg.size > top_n:
+               # Partial selection: keep every entry scoring at least the top_n-th value (ties included)
+               # so the stable sort below gives exactly the prefix of the full ranking
+               kth = np.partition(neg, top_n - 1)[top_n - 1]
+               cand = np.flatnonzero(neg <= kth)
+               order = cand[np.argsort(neg[cand], kind="stable")][:top_n]
+           else:
+               order = np.argsort(neg, kind="stable")
+           sorted_keywords = feature_names[cols[order]].tolist()
    
            all_sorted_keywords.append(sorted_keywords)
    
        return all_sorted_keywords
 
 
-def grouping_into_smaller_chunks(chunk:list[int], similarity_matrix:np.ndarray, threshold:int):
+def grouping_into_smaller_chunks(chunk:list[int], consec_sim:np.ndarray, threshold:float):
     """
     Creates smaller groups from the input group based on a threshold.
-    It references the similarity matrix and groups consecutive sentences if their similarity is at or above the threshold.
+    It references the consecutive-sentence similarities and groups consecutive sentences if their similarity is at or above the threshold.
     The threshold is set to the minimum of {the threshold passed for the current depth} and {the 9th smallest similarity value between consecutive sentences}.
     This is to prevent more than 10 child nodes from being generated at a single level.
 
     Args:
-        chunk: The input group, a list of sentence indices.
-        similarity_matrix: The matrix storing similarity values between sentences.
+        chunk: The input group, a list of consecutive sentence indices.
+        consec_sim: consec_sim[i] is the similarity between sentence i and sentence i+1.
         threshold: The threshold value used as the criterion for grouping.
 
     returns:
-        new_chunk_groups: The newly created smaller groups.
+        new_chunk_groups: The newly created smaller groups (lists of positions in chunk).
     """
     num_sentences = len(chunk)
+    if num_sentences == 0:
+        return []
+    # Similarities of consecutive sentences in this group form a contiguous slice of consec_sim
+    gaps = consec_sim[chunk[0]:chunk[-1]]
     # Case where there are more than 10 sentences
     if num_sentences >10:
-        # Extract similarities of consecutive sentences and sort them in ascending order
-        gaps = []
-        for i in range(1, num_sentences):
-            sim = similarity_matrix[chunk[i]][chunk[i-1]]
-            gaps.append(sim)
-        gaps.sort()
-        threshold=min(threshold, gaps[8])
-        
-    new_chunk_groups = []
-    visited = set()
-    for idx in range(len(chunk)):
-        if idx in visited:
-            continue
-        new_chunk = [idx]
-        visited.add(idx)
-        for next_idx in range(idx + 1, len(chunk)):
-            if next_idx in visited:
-                continue
-            if similarity_matrix[chunk[next_idx]][chunk[next_idx-1]]>=threshold:
-                new_chunk.append(next_idx)
-                visited.add(next_idx)
-            else:
-                break
-        new_chunk_groups.append(new_chunk)
+        # Only the 9th smallest value is needed, so partition instead of a full sort
+        threshold=min(threshold, float(np.partition(gaps, 8)[8]))
+
+    # Start a new group wherever the similarity to the previous sentence drops below the threshold
+    # Groups are consecutive runs, so each one is just the range between two boundaries
+    bounds = [0, *(np.flatnonzero(~(gaps >= threshold)) + 1).tolist(), num_sentences]
+    new_chunk_groups = [list(range(start, end)) for start, end in zip(bounds, bounds[1:])]
 
     return new_chunk_groups
 
 
-def check_termination_condition(chunk: list[dict], depth:int):
+def token_prefix_sums(sentence_tokens: list[list[str]]) -> np.ndarray:
+    """Returns prefix sums of sentence token counts (prefix[i] = tokens in sentences 0..i-1)."""
+    token_lens = np.fromiter((len(t) for t in sentence_tokens), dtype=np.int64, count=len(sentence_tokens))
+    return np.concatenate(([0], np.cumsum(token_lens)))
+
+
+def count_tokens(chunk: list[int], token_prefix: np.ndarray) -> int:
+    """Returns the number of tokens in a chunk of consecutive sentence indices (a single range lookup)."""
+    if not chunk:
+        return 0
+    return int(token_prefix[chunk[-1] + 1] - token_prefix[chunk[0]])
+
+
+def check_termination_condition(chunk: list[int], depth:int, token_prefix: np.ndarray):
     """
     Checks if the termination condition for the recursive function is met and returns a flag.
         flag 1: chunk size is 15 tokens or less
@@ -139,7 +219,7 @@ def check_termination_condition(chunk: list[dict], depth:int):
 
     """
     flag=-1
-    size = sum([len(c["tokens"]) for c in chunk])
+    size = count_tokens(chunk, token_prefix)
     # flag 1: If the chunk size is 15 tokens or less, do not split further
     if size<=15:
         flag=1
@@ -154,106 +234,110 @@ def check_termination_condition(chunk: list[dict], depth:int):
     return flag
 
 
-def nonrecurrsive_chunking(chunk:list[dict], similarity_matrix:np.ndarray, top_keyword:str):
+def nonrecurrsive_chunking(chunk:list[int], consec_sim:np.ndarray, top_keyword:str):
     """
-    depth 5 이상인데 청크가 500토큰 이하인 경우,
+    depth 5 이상인데 청크가 500토큰을 초과하는 경우,
     최대 5개의 그룹으로 분할하여 반환합니다.
     이렇게 생성된 5개의 그룹은 지식 그래프의 깊이가 너무 깊어지는 것을 방지하기 위해
     각 청크를 위한 키워드를 생성하지 않고 입력 청크의 키워드(top_keyword)를 해당 그룹의 키워드로 합니다.
 
     Args:
-        chunk: 입력 청크
-        similarity_matrix: 각 문장간 유사도를 저장한 행렬
+        chunk: 입력 청크 (연속한 문장 인덱스 리스트)
+        consec_sim: 연속한 문장 간 유사도 배열 (consec_sim[i]는 문장 i와 i+1의 유사도)
         top_keyword: 입력 청크의 키워드
     
     Return:
         result: 분할한 그룹을 저장한 리스트, 각 그룹을 구성하는 문장 인덱스
     """
     length=len(chunk)
+    if length == 0:
+        return []
     num_chunks= length if length<5 else 5
-    consec_similarity=[] #현재 청크 내부의 연속적인 index간의 유사도만 저장
-    for i in range(length-1):
-        current=chunk[i]["index"]
-        next=chunk[i+1]["index"]
-        consec_similarity.append(similarity_matrix[current][next]) 
-    consec_similarity=sorted(consec_similarity, key=lambda x:x[0], reverse=True)[:num_chunks]
-    consec_similarity=sorted(consec_similarity, key=lambda x:x[1], reverse=True)
-
-    for _, idx in consec_similarity:
-            result+=[{ "chunks": [c["index"] for c in chunk if c["index"]<=idx],
-                    "keyword": top_keyword}]
+
+    # 현재 청크 내부의 연속적인 문장 간 유사도 (연속한 문장이므로 consec_sim의 구간 슬라이스)
+    consec_similarity = consec_sim[chunk[0]:chunk[-1]]
+    # 유사도가 가장 낮은 (num_chunks-1)개 지점에서 자르고, 자르는 위치는 문장 순서대로 정렬
+    if num_chunks > 1:
+        cuts = np.sort(np.argpartition(consec_similarity, num_chunks-2)[:num_chunks-1]) + 1
+    else:
+        cuts = []
+
+    result = [{"chunks": group.tolist(), "keyword": top_keyword}
+              for group in np.split(np.asarray(chunk), cuts)]
     
     return result
 
 
-def gen_node_edges_for_new_groups(chunk:list[dict], new_chunk_groups, top_keyword, already_made, source_id):
+def gen_node_edges_for_new_groups(chunk:list[int], new_chunk_groups, top_keyword, already_made:set[str], source_id, sentence_tokens, token_prefix, vectorizer=None, nodes=None, edges=None):
     """
     Converts groups, represented as index lists, into the chunk format for the next recursive call.
     Extracts keywords from each chunk to create nodes.
     Creates edges connecting the generated nodes to the keyword node of the current depth.
 
     Args:
-        chunk: Full chunk information for the current depth.
-        new_chunk_groups: Newly generated group information represented as a list of sentence indices.
-        already_made: A list storing the names of already created nodes.
+        chunk: Sentence indices of the chunk at the current depth.
+        new_chunk_groups: Newly generated group information represented as a list of positions in chunk.
+        already_made: A set storing the names of already created nodes.
+        sentence_tokens: The token list of every sentence of the whole text (indexed by sentence index).
+        token_prefix: Prefix sums of sentence token counts for the whole text.
+        vectorizer: TF-IDF vectorizer fitted on the whole text (optional).
+        nodes, edges: Accumulator lists the new nodes/edges are appended to (new lists if omitted).
     """
 
     # Generate go_chunk and get_topics based on the sentence indices stored in new_chunk_group
     # go_chunk is the argument for the recursively called function to perform chunking again
     # get_topics is the argument for the function to extract core keywords from the newly divided chunk groups
-    go_chunk = []
-    get_topics = []
-    for group in new_chunk_groups:
-        go_chunk_temp = []
-        get_topics_temp = []
-        for mem in group:
-            get_topics_temp += chunk[mem]["tokens"]
-            go_chunk_temp.append(chunk[mem])
-        go_chunk.append(go_chunk_temp)
-        get_topics.append(get_topics_temp)
+    go_chunk = [[chunk[mem] for mem in group] for group in new_chunk_groups]
+    get_topics = [[token for idx in sentences for token in sentence_tokens[idx]] for sentences in go_chunk]
 
 
     # Create nodes and edges based on the chunking results from this step
-    keywords=[]
-    nodes=[]
-    edges=[]
-
-    chunk_topics=extract_keywords_by_tfidf(get_topics)
+    # keywords is preallocated so each group keeps its own keyword; groups without a new topic stay "none"
+    keywords=["none"] * len(go_chunk)
+    if nodes is None:
+        nodes=[]
+    if edges is None:
+        edges=[]
+
+    # Only the first keyword not yet used is needed, so rank a few candidates per group
+    chunk_topics=extract_keywords_by_tfidf(get_topics, vectorizer, TOPIC_CANDIDATES)
+    # Token count of every group, computed once from the prefix sums (groups are runs of consecutive sentences)
+    group_starts = np.fromiter((g[0] for g in go_chunk), dtype=np.int64, count=len(go_chunk))
+    group_ends = np.fromiter((g[-1] + 1 for g in go_chunk), dtype=np.int64, count=len(go_chunk))
+    group_sizes = token_prefix[group_ends] - token_prefix[group_starts]
     # Select one non-duplicate topic keyword extracted via TF-IDF as the representative keyword for each chunk
     # Create a node with the representative keyword of each chunk
     for idx, topics in enumerate(chunk_topics):
-        for t_idx in range(len(topics)):
-            # If the topic keyword is not an already created node keyword, create a node
-            if topics[t_idx] not in already_made:
-                # If the length of the sentences from which the topic keyword is derived is 15 tokens or less, save the sentences as the description
-                if sum([len(sentence["tokens"]) for sentence in go_chunk[idx]])< 15:
-                    chunk_node={"label":topics[t_idx],"name":topics[t_idx],
-                                "descriptions":[c["index"] for c in go_chunk[idx]],
-                                "source_id":source_id}
-                    edge={"source": top_keyword, "target": topics[t_idx], "relation":"Related"}
-                    keywords.append(topics[t_idx])
-                # If the length of the sentences from which the topic keyword is derived is long, create a node with an empty description
-                else:
-                    connective_node=topics[t_idx]+"*"
-                    chunk_node={"label":topics[t_idx],"name":connective_node,"descriptions":[], "source_id":source_id}
-                    edge={"source": top_keyword, "target": connective_node, "relation":"Related"}
-                    keywords.append(connective_node)
-                nodes.append(chunk_node)
-                edges.append(edge)
-                already_made.append(topics[t_idx])
-                break
-    
-    # If the number of topic keywords is less than the number of chunks due to keyword duplication, etc.
-    check_num_t=len(go_chunk)-len(keywords)
-    if check_num_t > 0:
-        keywords+=check_num_t*["none"]
+        # The first topic keyword that is not an already created node keyword becomes the node
+        topic = next((t for t in topics if t not in already_made), None)
+        if topic is None and len(topics) == TOPIC_CANDIDATES:
+            # Every candidate is taken: rank the whole group as before
+            topics = extract_keywords_by_tfidf([get_topics[idx]], vectorizer)[0]
+            topic = next((t for t in topics if t not in already_made), None)
+        if topic is None:
+            continue
+        # If the length of the sentences from which the topic keyword is derived is 15 tokens or less, save the sentences as the description
+        if group_sizes[idx]< 15:
+            chunk_node={"label":topic,"name":topic,
+                        "descriptions":list(go_chunk[idx]),
+                        "source_id":source_id}
+            edge={"source": top_keyword, "target": topic, "relation":"Related"}
+            keywords[idx]=topic
+        # If the length of the sentences from which the topic keyword is derived is long, create a node with an empty description
+        else:
+            connective_node=topic+"*"
+            chunk_node={"label":topic,"name":connective_node,"descriptions":[], "source_id":source_id}
+            edge={"source": top_keyword, "target": connective_node, "relation":"Related"}
+            keywords[idx]=connective_node
+        nodes.append(chunk_node)
+        edges.append(edge)
+        already_made.add(topic)
 
-    
     return nodes, edges, go_chunk, keywords
 
 
-def recurrsive_chunking(chunk: list[int], source_id:str ,depth: int, top_keyword:str ,already_made:list[str], similarity_matrix, threshold: int):
-    """Recursive chunking based on similarity/keywords.
+def recurrsive_chunking(chunk: list, source_id:str ,depth: int, top_keyword:str ,already_made:set[str], consec_sim, threshold: int, vectorizer=None, token_prefix=None, sentence_tokens=None):
+    """Recursive chunking based on similarity/keywords (traversed depth-first with an explicit stack).
 
     Logic Summary:
       - At depth=0, estimate the main topic keyword (top_keyword) for the entire text using LDA and calculate the initial threshold.
@@ -262,27 +346,42 @@ def recurrsive_chunking(chunk: list[int], source_id:str ,depth: int, top_keyword
       - At each step, construct representative keyword nodes and child keyword nodes/edges.
 
     Args:
-        chunk: A list of (tokenized sentence, index) pairs ({"tokens", "index"}) to be split at the current step.
+        chunk: At depth=0, the whole text as a list of {"tokens", "index"} dicts.
+            At depth>0, the sentence indices of the group to be split at the current step.
         source_id: Source identifier (for graph node metadata).
-        depth: Current recursion depth (starts at 0).
-        already_made: A name cache to prevent duplicate node creation.
+        depth: Depth of the given chunk (callers start at 0).
+        already_made: A name cache (set) to prevent duplicate node creation. It is mutated in place.
         top_keyword: The representative keyword passed from the parent step (or estimated by LDA at depth=0).
+        consec_sim: Similarities between consecutive sentences (calculated by LDA at depth=0).
         threshold: The similarity threshold for adjacent sentences (initial value calculated at depth=0).
-        lda_model, dictionary, num_topics: Parameters related to LDA estimation.
+        vectorizer: TF-IDF vectorizer shared by all depths (fitted on the whole text at depth=0).
+        token_prefix: Prefix sums of sentence token counts (built from the whole text at depth=0).
+        sentence_tokens: Token lists of all sentences, indexed by sentence index (built at depth=0).
 
     Returns:
-        Tuple[list[dict], dict, list[str]]: (List of chunking results, {"nodes", "edges", "keyword"}, updated already_made)
+        Tuple[list[dict], dict, set[str]]: (List of chunking results, {"nodes", "edges", "keyword"}, updated already_made set)
     """
     result=[]
     nodes_and_edges={"nodes":[], "edges":[]}
-    chunk_indices=[c["index"] for c in chunk] # Create a list storing only the indices of sentences within the current group
-
 
     if depth == 0:
-        # Use LDA to find the keywords of the entire text and the similarity between topics of each chunk
-        # If depth is 0, the topic inferred by LDA for the entire text becomes the top keyword for this chunk (==full text)
-        top_keyword, similarity_matrix = lda_keyword_and_similarity(chunk)
-        already_made.append(top_keyword)
+        # Split the sentence dicts into parallel structures once: deeper levels only pass sentence indices
+        sentence_tokens = [c["tokens"] for c in chunk]
+        # Fit the keyword TF-IDF vocabulary/IDF once and reuse it at every depth
+        if vectorizer is None:
+            vectorizer = fit_keyword_vectorizer(sentence_tokens)
+        # Use LDA (or the cheaper TF-IDF path) to find the keywords of the entire text and the similarity between sentences
+        # If depth is 0, the keyword inferred for the entire text becomes the top keyword for this chunk (==full text)
+        # (too few sentences to estimate 5 topics: LDA is skipped regardless of the setting)
+        if USE_LDA_SIMILARITY and len(chunk) >= LDA_MIN_SENTENCES:
+            top_keyword, consec_sim = lda_keyword_and_similarity(chunk)
+        else:
+            top_keyword, consec_sim = tfidf_keyword_and_similarity(sentence_tokens, vectorizer)
+        chunk = [c["index"] for c in chunk]
+        # Token counts of any sentence range become a single lookup
+        if token_prefix is None:
+            token_prefix = token_prefix_sums(sentence_tokens)
+        already_made.add(top_keyword)
         top_keyword+="*"
         # Create the root node of the knowledge graph
         top_node={"label":top_keyword,
@@ -292,108 +391,123 @@ def recurrsive_chunking(chunk: list[int], source_id:str ,depth: int, top_keyword
             }
         nodes_and_edges["nodes"].append(top_node)
         
-        # Set the bottom 25% value of the similarity matrix as the initial threshold
+        # Set the bottom 25% value of the consecutive-sentence similarities as the initial threshold
+        # (grouping only compares adjacent sentences, so the quantile is taken over the same values)
         # Afterwards, it is multiplied by 1.1 as the depth increases
         # The smaller of this threshold and {the 10th percentile similarity value of the chunk} becomes the grouping criterion
         # To limit the number of child nodes created in one step to a maximum of 10
-        try:
-            if similarity_matrix.size > 0:
-                flattened = similarity_matrix[np.triu_indices_from(similarity_matrix, k=1)]
-                threshold = np.quantile(flattened, 0.25)
-            else:
-                logging.error("similarity_matrix creation error: empty or invalid matrix")
-                return [], {}, []
-                
-        except Exception as e:
-            logging.error(f"Error during threshold calculation: {e}")
+        if consec_sim is None:
+            logging.error("similarity creation error: LDA topic estimation failed")
+            return [], {}, already_made
+        if consec_sim.size > 0:
+            # Lower 25% quantile by partial selection instead of a full sort
+            k = int(0.25 * (consec_sim.size - 1))
+            threshold = float(np.partition(consec_sim, k)[k])
+        else:
+            logging.error("Error during threshold calculation: fewer than two sentences")
             threshold = 0.5  # Set default value
 
-    else:
-        # If depth is not 0
-        # Check termination condition
-        flag = check_termination_condition(chunk, depth)
+    # Depth-first traversal with an explicit stack instead of Python recursion
+    # Children are pushed in reverse so they are visited in order, which keeps
+    # nodes, edges and chunking results in the same order as the recursive version.
+    stack = [(chunk, depth, top_keyword, threshold)]
+    while stack:
+        chunk, depth, top_keyword, threshold = stack.pop()
 
-        if flag==3:
-            result = nonrecurrsive_chunking(chunk, similarity_matrix, top_keyword)
-            return result, nodes_and_edges, already_made
-        
-        # Terminate recursion if fetching similarity between chunks fails
-        # If depth is 1 or more, the top_keyword is the keyword passed from the previous step (derived from tf-idf)
+        if depth > 0:
+            # Check termination condition
+            flag = check_termination_condition(chunk, depth, token_prefix)
 
-        # If the chunk size is 3 sentences or less, or 20 tokens or less, do not save the chunk
-        # This is because this chunk does not need to generate any more knowledge graph
-        elif flag==1:
-            logging.info(f"depth {depth} chunking terminated, flag:{flag}")
-            return result , nodes_and_edges, already_made
+            if flag==3:
+                result.extend(nonrecurrsive_chunking(chunk, consec_sim, top_keyword))
+                continue
 
-        # If other termination conditions are met
-        elif flag != -1:
-            result += [{ "chunks":chunk_indices, "keyword": top_keyword}]
-            logging.info(f"depth {depth} chunking terminated, flag:{flag}")
-            return result , nodes_and_edges, already_made
+            # If depth is 1 or more, the top_keyword is the keyword passed from the previous step (derived from tf-idf)
 
+            # If the chunk size is 15 tokens or less, do not save the chunk
+            # This is because this chunk does not need to generate any more knowledge graph
+            elif flag==1:
+                logging.info(f"depth {depth} chunking terminated, flag:{flag}")
+                continue
 
-    # Split the input group into smaller groups
-    new_chunk_groups = grouping_into_smaller_chunks(chunk_indices, similarity_matrix, threshold)
+            # If other termination conditions are met
+            elif flag != -1:
+                result.append({ "chunks":chunk, "keyword": top_keyword})
+                logging.info(f"depth {depth} chunking terminated, flag:{flag}")
+                continue
 
-    # Extract keywords for the newly created small groups and generate nodes & edges
-    nodes, edges, go_chunk, keywords = gen_node_edges_for_new_groups(chunk, new_chunk_groups, top_keyword, already_made, source_id)
-    nodes_and_edges["nodes"]+=nodes
-    nodes_and_edges["edges"]+=edges
-    
-    # Recursively call the function to further subdivide the created groups
-    current_result = []
-    for idx, c in enumerate(go_chunk):
-        if idx > len(keywords)-1 or len(keywords)==0:
-            logging.error(f"keyword generation error\nkeywords:{keywords}\nnumber of chunks:{len(go_chunk)}")
-            break
-        result, graph, already_made_updated = recurrsive_chunking(c, source_id ,depth+1, keywords[idx], already_made, similarity_matrix, threshold*1.1,)
-        # Update already_made to prevent duplicate nodes from being created
-        already_made=already_made_updated
-        current_result+=(result)
-        nodes_and_edges["nodes"]+=graph["nodes"]
-        nodes_and_edges["edges"]+=graph["edges"]
-
-    return current_result, nodes_and_edges, already_made
+        # Split the input group into smaller groups
+        new_chunk_groups = grouping_into_smaller_chunks(chunk, consec_sim, threshold)
+
+        # Extract keywords for the newly created small groups and generate nodes & edges
+        # (appended straight into the top-level accumulators instead of per-level lists)
+        _, _, go_chunk, keywords = gen_node_edges_for_new_groups(chunk, new_chunk_groups, top_keyword, already_made, source_id, sentence_tokens, token_prefix, vectorizer,
+                                                                 nodes_and_edges["nodes"], nodes_and_edges["edges"])
+
+        # Queue the created groups for further subdivision
+        children = [(c, depth+1, keywords[idx], threshold*1.1) for idx, c in enumerate(go_chunk)]
+        stack.extend(reversed(children))
+
+    return result, nodes_and_edges, already_made
 
 
 def lda_keyword_and_similarity(chunk:list[dict]):
     """
     Uses gensim's LDA model to extract topic keywords from the chunk
     and generates topic vectors for each sentence composing the chunk.
-    It calculates the similarity between each sentence's topic vectors to create a similarity matrix.
-    Returns the extracted topic keyword, the generated LDA model, and the similarity matrix.
+    It calculates the similarity between the topic vectors of consecutive sentences,
+    which is the only similarity the chunking step ever reads (no N x N matrix is built).
+    Returns the extracted topic keyword and the similarities between consecutive sentences.
 
     Args:
         chunk: A list of {"tokens": List[str], "index": int}
-        lda_model: Reusable LDA model (if not provided, it's trained)
-        dictionary: Reusable gensim Dictionary (if not provided, it's created)
 
     Returns:
-        Tuple[str, models.LdaModel, np.ndarray]: (top_keyword, lda_model, similarity_matrix)
+        Tuple[str, np.ndarray]: (top_keyword, consec_sim)
+            consec_sim[i] is the similarity between sentence i and sentence i+1 (float32).
+            consec_sim is None if LDA fails.
     """
     tokens = [c["tokens"] for c in chunk]
 
-    # If the LDA model doesn't exist, train it; otherwise, reuse it
+    # Build the dictionary/bag-of-words corpus once; it is used for both training and inference
     try:
         dictionary = corpora.Dictionary(tokens)
         corpus = [dictionary.doc2bow(text) for text in tokens]
-        lda_model = models.LdaModel(corpus, num_topics=5, id2word=dictionary, passes=20, iterations=400, random_state=8)
+        chunksize = max(64, len(tokens))
+        workers = max(1, (os.cpu_count() or 2) - 1)
+        t0 = time.perf_counter()
+        # alpha="symmetric": fixed prior, no per-update alpha optimization
+        if len(tokens) >= LDA_MULTICORE_MIN_SENTENCES and workers > 1:
+            # Long texts: train in parallel on all but one core
+            # A single whole-corpus chunk would be one job per pass (only one worker busy), so the corpus is
+            # split into one chunk per worker; together they still make one update per pass
+            lda_model = models.LdaMulticore(corpus, num_topics=5, id2word=dictionary,
+                                            workers=workers,
+                                            chunksize=math.ceil(len(tokens) / workers), passes=LDA_PASSES,
+                                            iterations=LDA_ITERATIONS, alpha="symmetric",
+                                            random_state=8)
+        else:
+            lda_model = models.LdaModel(corpus, num_topics=5, id2word=dictionary, chunksize=chunksize,
+                                        passes=LDA_PASSES, iterations=LDA_ITERATIONS, alpha="symmetric",
+                                        random_state=8)
+        logging.info("LDA training: %d sentences, %.3f s", len(tokens), time.perf_counter() - t0)
 
     except Exception as e:
         logging.error(f"Error occurred during LDA processing: {e}")
-        return "", lda_model, np.array([])
-
-    corpus = [dictionary.doc2bow(text) for text in tokens]
-
-    topic_distributions = []
-    for bow in corpus:
-        dist = lda_model.get_document_topics(bow, minimum_probability=0)
-        dense_vec = [prob for _, prob in sorted(dist, key=lambda x: x[0])]
-        topic_distributions.append(dense_vec)
-
-    topic_vectors = np.array(topic_distributions)
-    sim_matrix = cosine_similarity(topic_vectors)
+        return "", None
+
+    # Infer the topic distribution of every sentence in one batch
+    # gamma rows are already in topic-id order; normalizing them gives the same values as get_document_topics
+    gamma, _ = lda_model.inference(corpus)
+    # Similarities only drive coarse threshold decisions, so float32 is enough and halves memory traffic
+    gamma = gamma.astype(np.float32, copy=False)
+    topic_vectors = gamma / gamma.sum(axis=1, keepdims=True)
+    # Cosine similarity = dot product of L2-normalized vectors (normalize once)
+    norms = np.linalg.norm(topic_vectors, axis=1, keepdims=True)
+    unit_vectors = topic_vectors / np.maximum(norms, np.float32(1e-12))
+    # Grouping only ever compares adjacent sentences, so only those similarities are computed:
+    # row-wise dot products of neighbouring sentences (the first superdiagonal of the full matrix)
+    consec_sim = np.einsum("ij,ij->i", unit_vectors[:-1], unit_vectors[1:])
 
     # Extract the top keyword(s) for the first topic from the LDA model
     top_topic_terms = lda_model.show_topic(0, topn= 1)
@@ -401,56 +515,94 @@ def lda_keyword_and_similarity(chunk:list[dict]):
     # (Prevents error if the LDA model failed to generate topics)
     top_keyword = top_topic_terms[0][0] if top_topic_terms and len(top_topic_terms) > 0 else ""
 
-    return top_keyword, sim_matrix
+    return top_keyword, consec_sim
 
 
-def all_chunks_tf_idf_(tokenized_chunks:list[list[list[str]]]):
-    vectorizer = TfidfVectorizer(
-        stop_words=stopwords_en,
-        max_features=5000,
-        tokenizer=lambda x: x,      # Use the input (token list) as is
-        preprocessor=lambda x: x,  # Skip preprocessing
-        token_pattern=None,        # Prevent warning
-        lowercase=False            # Prevents 'list' object has no attribute 'lower' error when skipping preprocessing/tokenization
-    )
-    flattened_chunks = []
-    for chunk in tokenized_chunks:
-        # chunk = [ [s1_token1, s1_token2], [s2_token1] ]
-        # doc_tokens = [ s1_token1, s1_token2, s2_token1 ]
-        doc_tokens = [token for sentence in chunk for token in sentence]
-        flattened_chunks.append(doc_tokens)
+def tfidf_keyword_and_similarity(sentence_tokens: list[list[str]], vectorizer: TfidfVectorizer):
+    """
+    Cheaper alternative to `lda_keyword_and_similarity` that needs no model training.
+    Uses the TF-IDF vectors of the shared vectorizer as sentence vectors.
+
+    Args:
+        sentence_tokens: The token list of every sentence of the whole text.
+        vectorizer: A vectorizer fitted on the whole text (see `fit_keyword_vectorizer`).
+
+    Returns:
+        Tuple[str, np.ndarray]: (top_keyword, consec_sim), same contract as `lda_keyword_and_similarity`.
+            top_keyword is the term with the largest total TF-IDF over the text.
+            consec_sim is None if the text has no usable vocabulary.
+    """
+    if vectorizer is None:
+        logging.error("Error occurred during TF-IDF similarity: empty vocabulary")
+        return "", None
+    # Rows are already L2-normalized by TfidfVectorizer, so a row-wise dot product is the cosine similarity
+    tfidf_matrix = vectorizer.transform(sentence_tokens).tocsr()
+    consec_sim = np.asarray(tfidf_matrix[:-1].multiply(tfidf_matrix[1:]).sum(axis=1), dtype=np.float32).ravel()
+    term_scores = np.asarray(tfidf_matrix.sum(axis=0)).ravel()
+    top_keyword = str(vectorizer.keyword_feature_names_[term_scores.argmax()])
+    return top_keyword, consec_sim
+
+
+def _fast_top_keyword(chunk: list[dict]) -> str:
+    """Returns the highest TF-IDF term of the whole text without training LDA.
+
+    Used for short texts, where only the representative keyword is needed
+    and the LDA similarity matrix would be discarded.
+
+    Args:
+        chunk: A list of {"tokens": List[str], "index": int}
+
+    Returns:
+        str: The top term, or "" if the text has no usable vocabulary.
+    """
+    # With a single document every term has the same IDF, so the top TF-IDF term is the most frequent
+    # non-stop word (ties go to the first term in vocabulary order, like argmax over the sorted vocabulary)
+    counts = Counter(token for c in chunk for token in c["tokens"] if token not in _STOPWORDS_EN)
+    if not counts:
+        # Case where the text consists only of stop words or is empty
+        return ""
+    return min(counts, key=lambda w: (-counts[w], w))
+
+
+def all_chunks_tf_idf_(flattened_chunks:list[list[str]], vectorizer: TfidfVectorizer = None):
+    """Calculates TF-IDF over the final chunks (each chunk is one document).
+
+    Args:
+        flattened_chunks: The tokens of each chunk, already flattened across its sentences.
+        vectorizer: A vectorizer already fitted on the whole text (see `fit_keyword_vectorizer`).
+            If provided, the chunks are only transformed with its vocabulary/IDF.
+
+    Returns:
+        Tuple[csr_matrix, np.ndarray]: (TF-IDF matrix with one row per chunk, feature names),
+        or (None, None) if the chunks have no usable vocabulary.
+    """
+    if vectorizer is None:
+        vectorizer = _new_keyword_vectorizer(SHARED_TFIDF_MAX_FEATURES)
     try:
-        tfidf_matrix = vectorizer.fit_transform(flattened_chunks)
+        if hasattr(vectorizer, "keyword_feature_names_"):
+            # Shared vectorizer: reuse the vocabulary/IDF fitted on the whole text
+            tfidf_matrix = vectorizer.transform(flattened_chunks)
+        else:
+            tfidf_matrix = vectorizer.fit_transform(flattened_chunks)
 
     except ValueError as e:
         # Case where all documents consist of stop words or are empty, resulting in an empty vocabulary
         if "empty vocabulary" in str(e):
-            return [[] for _ in tokenized_chunks]
+            return None, None
         else:
             raise e
-        
-    # 1. Get the list of all unique tokens (features).
-    feature_names = vectorizer.get_feature_names_out()
-    
-    # 2. List to store the results.
-    tfidf_results = []
 
-    # 3. Iterate through the tfidf_matrix one row at a time.
-    #    Each row corresponds to one group.
-    for i in range(tfidf_matrix.shape[0]):
-        row = tfidf_matrix[i]
-        
-        # 4. Create a dictionary of scores for tokens that exist only in this row (document).
-        #    row.indices: Indices (in feature_names) of tokens present in this document.
-        #    row.data: The TF-IDF scores for those tokens.
-        chunk_dict = {
-            feature_names[col_idx]: score
-            for col_idx, score in zip(row.indices, row.data)
-        }
-        
-        tfidf_results.append(chunk_dict)
+    # Keep the sparse matrix as is; each row is read with `row_items` only when it is needed
+    feature_names = getattr(vectorizer, "keyword_feature_names_", None)
+    if feature_names is None:
+        feature_names = np.asarray(vectorizer.get_feature_names_out())
+    return tfidf_matrix.tocsr(), feature_names
+
 
-    return tfidf_results
+def row_items(csr, i: int, feature_names: np.ndarray):
+    """Returns (tokens, scores) of the nonzero TF-IDF entries in row i of a CSR matrix."""
+    start, end = csr.indptr[i], csr.indptr[i + 1]
+    return feature_names[csr.indices[start:end]], csr.data[start:end]
 
 
 def extract_graph_components(text: str, id: tuple):
@@ -477,11 +629,14 @@ def extract_graph_components(text: str, id: tuple):
     chunks=[]
     
     tokenized, sentences = split_into_tokenized_sentence(text)
+    # Fit the TF-IDF vocabulary/IDF once for the whole text; it is shared by
+    # keyword extraction during chunking and by the final-chunk scoring below
+    vectorizer = fit_keyword_vectorizer([t["tokens"] for t in tokenized])
 
 
     # If the text is 2000 characters or longer, call the recursive chunking function
     if len(text)>=2000:
-        chunks, nodes_and_edges, already_made = recurrsive_chunking(tokenized, source_id, 0, "", [],  None, 0)
+        chunks, nodes_and_edges, already_made = recurrsive_chunking(tokenized, source_id, 0, "", set(),  None, 0, vectorizer)
         if chunks==[]:
             logging.info("Chunking failed.")
             
@@ -491,10 +646,11 @@ def extract_graph_components(text: str, id: tuple):
 
     # If the text is 1000 characters or less, do not call the recursive chunking function.
     else:
-        top_keyword, _ =lda_keyword_and_similarity(tokenized)
+        # Only the representative keyword is needed here, so skip LDA training
+        top_keyword = _fast_top_keyword(tokenized)
         if len(top_keyword)<1:
-            logging.error("Failed to extract LDA keyword.")
-        already_made=[top_keyword]
+            logging.error("Failed to extract top keyword.")
+        already_made={top_keyword}
         top_keyword+="*"
         chunk=list(range(len(sentences)))
         chunks=[{"chunks":chunk, "keyword":top_keyword}]
@@ -503,39 +659,57 @@ def extract_graph_components(text: str, id: tuple):
 
     # For chunks with 3 sentences or less, treat the chunk itself as a node (Note: This comment seems to describe a logic, the next part implements description conversion)
     # Convert each node's description from a list of sentence indices to actual text
+    # An object array lets each node gather its sentences with a single fancy index
+    sentence_arr = np.array(sentences, dtype=object)
     for node in all_nodes:
         resolved_description=""
         if node["descriptions"] != []:
-            resolved_description="".join([sentences[idx] for idx in node["descriptions"]])
+            resolved_description="".join(sentence_arr[node["descriptions"]])
 
         node["original_sentences"]=[{"original_sentence":resolved_description,
                                      "source_id":source_id,
                                      "score": 1.0}]
         node["descriptions"]=[{"description":resolved_description, "source_id":source_id}]
 
-        store_embeddings(node, brain_id, None)
+    # Embed every node description in one batch instead of one model call per node
+    store_embeddings_batch(all_nodes, brain_id)
     
+    # Collect, in one pass over the final chunks, the per-sentence tokens, the flattened
+    # document for TF-IDF, the sentences and the keyword of each chunk
     chunk_keywords=[]
     chunk_sentences=[]
     tokenized_chunks=[]
+    flattened_chunks=[]
     
     for c in chunks:
+        if "chunks" not in c:
+            continue
         chunk_tokens =[]
+        flat_tokens =[]
         chunk_sent=[]
-        if "chunks" in c:
-            for s_idx in c["chunks"]:
-                chunk_tokens.append(tokenized[s_idx]['tokens'])
-                chunk_sent.append(sentences[s_idx])
-                chunk_keywords.append(c["keyword"])
-            tokenized_chunks.append(chunk_tokens)
-            chunk_sentences.append(chunk_sent)
-    chunk_tfidf = all_chunks_tf_idf_(tokenized_chunks)
+        for s_idx in c["chunks"]:
+            tokens = tokenized[s_idx]['tokens']
+            chunk_tokens.append(tokens)
+            flat_tokens.extend(tokens)
+            chunk_sent.append(sentences[s_idx])
+        # One keyword per chunk (not per sentence), so it stays aligned with the chunk index
+        chunk_keywords.append(c["keyword"])
+        tokenized_chunks.append(chunk_tokens)
+        flattened_chunks.append(flat_tokens)
+        chunk_sentences.append(chunk_sent)
+    chunk_tfidf, tfidf_features = all_chunks_tf_idf_(flattened_chunks, vectorizer)
 
     for c_idx in range(len(tokenized_chunks)):
-        if chunk_keywords[c_idx] != "":
-            nodes, edges, already_made = _extract_from_chunk(tokenized_chunks[c_idx],chunk_sentences[c_idx], id, chunk_keywords[c_idx], already_made, chunk_tfidf[c_idx])
-        all_nodes += nodes
-        all_edges += edges
+        if chunk_keywords[c_idx] == "":
+            continue
+        # Build the token -> score lookup only for chunks that are actually extracted
+        tfidf = []
+        if chunk_tfidf is not None:
+            tokens, scores = row_items(chunk_tfidf, c_idx, tfidf_features)
+            tfidf = dict(zip(tokens.tolist(), scores.tolist()))
+        nodes, edges, already_made = _extract_from_chunk(tokenized_chunks[c_idx],chunk_sentences[c_idx], id, chunk_keywords[c_idx], already_made, tfidf)
+        all_nodes.extend(nodes)
+        all_edges.extend(edges)
 
     logging.info(f"✅ Total {len(all_nodes)} nodes and {len(all_edges)} edges extracted.")
     return all_nodes, all_edges
@@ -552,18 +726,12 @@ def manual_chunking(text:str):
     """
 
     tokenized, sentences = split_into_tokenized_sentence(text)
-    chunks, _, _ =recurrsive_chunking(tokenized, "-1" , 0, [], None, 0, None, None)
+    chunks, _, _ =recurrsive_chunking(tokenized, "-1" , 0, "", set(), None, 0)
     #chunking 결과를 바탕으로, 더 이상 chunking하지 않는 chunk들은 node/edge를
 
-    final_chunks=[]
-    for c in chunks:
-        chunk=""
-        # 각 청크의 문장 인덱스들을 실제 텍스트로 변환
-        for idx in c["chunks"]:
-            # 인덱스가 sentences 배열의 범위 내에 있는지 확인
-            # (인덱스 오류 방지)
-            if idx < len(sentences):
-                chunk+=sentences[idx]
-        final_chunks.append(chunk)
+    # 각 청크의 문장 인덱스들을 실제 텍스트로 변환 (문자열 누적 대신 join 한 번)
+    # 인덱스가 sentences 배열의 범위 내에 있는지 확인 (인덱스 오류 방지)
+    num_sentences=len(sentences)
+    final_chunks=["".join(sentences[idx] for idx in c["chunks"] if idx < num_sentences) for c in chunks]
 
     return final_chunks
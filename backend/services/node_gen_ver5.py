@@ -3,34 +3,98 @@ import logging
 
 #pip install konlpy, pip install transformers torch scikit-learn
 
+import os
 import re
 from collections import defaultdict
+from functools import lru_cache
 from typing import List, Dict
 from konlpy.tag import Okt
-from sklearn.metrics.pairwise import cosine_similarity
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from tqdm import tqdm
 import spacy
 from .embedding_service import store_embeddings
+from .embedding_service import store_node_embeddings
 from .embedding_service import get_embeddings_batch
 import langid
 
+try:
+    # SIMD cosine kernels (listed in requirements.txt; NumPy matrix products cover platforms without a wheel)
+    import simsimd
+except ImportError:
+    simsimd = None
 
-stopwords = set([
+
+stopwords = frozenset([
     "사실", "경우", "시절", "내용", "점", "것", "수", "때", "정도", "이유", "상황", "뿐", "매우", "아주", "또한", "그리고", "그러나", "대한", "관한"
 ])
 
-stopwords_en= [
+stopwords_en= frozenset([
     "the", "an", "which", "they", "this", "you", "me"
-]
+])
+
+
+# 명사구 추출에 쓰는 품사 태그/어미 집합
+_NOUN_TAGS = frozenset(("Noun", "Alpha"))
+_VERB_TAGS = frozenset(("Adjective", "Verb"))
+_VERB_ENDINGS = frozenset("다요죠며지만")
 
+# 한국어 형태소 분석기로 Mecab 사용 여부 (KO_MORPH_MECAB=true, mecab-ko가 설치되어 있어야 함)
+USE_MECAB = os.getenv("KO_MORPH_MECAB", "false").lower() in ("1", "true", "yes")
 
 # 한국어용 형태소 분석기
-okt = Okt()
+mecab = None
+if USE_MECAB:
+    try:
+        from konlpy.tag import Mecab
+        mecab = Mecab()
+    except Exception as e:
+        logging.error("Mecab을 사용할 수 없어 Okt로 대체합니다: %s", str(e))
+okt = Okt() if mecab is None else None
+
+
+def _mecab_tag(tag: str) -> str:
+    """Mecab 품사 태그(세종 태그셋)를 Okt 태그로 변환합니다. (VV+EP 같은 복합 태그는 첫 태그 기준)"""
+    tag = tag.split("+")[0]
+    if tag.startswith("NN"):
+        return "Noun"
+    if tag == "SL":
+        return "Alpha"
+    if tag == "VA":
+        return "Adjective"
+    if tag == "VV":
+        return "Verb"
+    return tag
+
+
+@lru_cache(maxsize=8192)
+def _okt_pos(sentence: str) -> tuple:
+    """
+    문장의 (단어, Okt 품사) 목록을 캐시합니다.
+    Okt는 JVM 호출 비용이 커서, 반복되는 문장(머리글, 목록 항목 등)은 한 번만 분석합니다.
+    Mecab 사용 시 태그를 Okt 태그로 바꾸고, 용언은 Okt의 stem=True 결과처럼 기본형('-다')으로 맞춥니다.
+    """
+    if mecab is None:
+        return tuple(okt.pos(sentence, norm=True, stem=True))
+    words = []
+    for word, tag in mecab.pos(sentence):
+        tag = _mecab_tag(tag)
+        if tag in ("Adjective", "Verb"):
+            word += "다"
+        words.append((word, tag))
+    return tuple(words)
 
 # english noun extraction 
-nlp_en = spacy.load("en_core_web_sm")
+# (noun_chunks only needs the tagger and parser, so NER and the lemmatizer are not loaded)
+nlp_en = spacy.load("en_core_web_sm", disable=["ner", "lemmatizer"])
+# Worker processes for nlp_en.pipe (each process loads its own model copy, so 1 = in-process by default)
+_raw_spacy_n_process = os.getenv("SPACY_N_PROCESS", "1")
+try:
+    SPACY_N_PROCESS = max(1, int(_raw_spacy_n_process))
+except ValueError:
+    logging.warning("SPACY_N_PROCESS value (%s) is not an integer; using 1 process.", _raw_spacy_n_process)
+    SPACY_N_PROCESS = 1
+# Threads for Korean POS tagging; only used with Mecab, which releases the GIL (Okt calls stay serial)
+KO_POS_WORKERS = 4
 
 
 def extract_noun_phrases_ko(sentence: str) -> list[str]:
@@ -39,17 +103,17 @@ def extract_noun_phrases_ko(sentence: str) -> list[str]:
     추출한 명사구들의 리스트로 토큰화하여 반환합니다. 
     """
     #문장을 품사를 태깅한 단어의 리스트로 변환합니다.
-    words = okt.pos(sentence, norm=True, stem=True)
+    words = _okt_pos(sentence)
     phrases=[]
     current_phrase=[]
 
     for word, tag in words:
         if '\n' in word:
             continue
-        elif tag in ["Noun", "Alpha"]:
+        elif tag in _NOUN_TAGS:
             if word not in stopwords and len(word) > 1:
                 current_phrase.append(word)
-        elif tag in ["Adjective", "Verb"] and len(word)>1 and word[-1] not in '다요죠며지만':
+        elif tag in _VERB_TAGS and len(word)>1 and word[-1] not in _VERB_ENDINGS:
             current_phrase.append(word)
         else:
             if current_phrase:
@@ -67,7 +131,13 @@ def extract_noun_phrases_en(sentence: str) -> list[str]:
     """
     Extracts noun phrases from an English sentence.
     """
-    doc = nlp_en(sentence)
+    return _noun_phrases_from_doc(nlp_en(sentence))
+
+
+def _noun_phrases_from_doc(doc) -> list[str]:
+    """
+    Extracts noun phrases from a sentence already processed by nlp_en.
+    """
     phrases = []
 
     # Use spaCy's noun_chunks
@@ -81,38 +151,29 @@ def extract_noun_phrases_en(sentence: str) -> list[str]:
 
 
     
-def compute_phrase_embedding(
-    phrase: str,
-    indices: List[int],
-    sentences: List[str],
-    lang:str
-) -> tuple[str, tuple[float, np.ndarray], np.ndarray]:
+def _cosine_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
     """
-    Gets the embeddings of sentences containing a specific phrase and returns their average vector.
-    - phrase: The current word/phrase being processed.
-    - indices: List of sentence indices where the phrase appears.
-    - sentences: The complete list of sentences.
-    Returns: (phrase, avg_emb, embeddings)
+    Cosine similarity between every row of a and every row of b, shape (len(a), len(b)).
+    Zero vectors get a similarity of 0, like sklearn's cosine_similarity.
     """
-    # Highlighting
-    highlighted_texts = [sentences[idx].replace(phrase, f"[{phrase}]") for idx in indices]
-
-    # Sentence embeddings
-    embeddings = get_embeddings_batch(highlighted_texts, lang)  # shape: (N, D)
-    embeddings = np.atleast_2d(embeddings)
-
-    # Calculate average vector
-    avg_emb = np.mean(embeddings, axis=0)
-    avg_emb = np.ravel(avg_emb)  # shape (D,)
-
-    return phrase, avg_emb, embeddings
+    if simsimd is not None:
+        a = np.ascontiguousarray(a, dtype=np.float32)
+        b = np.ascontiguousarray(b, dtype=np.float32)
+        sim = 1 - np.asarray(simsimd.cdist(a, b, metric="cosine"))
+        # simsimd treats two zero vectors as identical; match the NumPy path instead
+        sim[~a.any(axis=1), :] = 0
+        sim[:, ~b.any(axis=1)] = 0
+        return sim
+    # Cosine similarity = dot product of L2-normalized vectors
+    a_unit = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b_unit = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    return a_unit @ b_unit.T
 
 # Function to calculate the importance score of each keyword
 # Calculates centrality score by similarity to the central vector and multiplies by tf score to derive importance score.
 def compute_scores(
     phrase_info: List[dict], 
     sentences: List[str],
-    lang:str,
     tfidf:dict
 ) -> tuple[Dict[str, tuple[float, np.ndarray]], List[str], np.ndarray]:
     scores = {}
@@ -120,49 +181,42 @@ def compute_scores(
     total_sentences = len(sentences)
 
     phrase_embeddings = {}
-    central_vecs = []
 
     # Generate a semantic vector for each keyword by embedding the sentences where it appears and then averaging them.
-    # Also, prepare to calculate the tf score for each keyword.
-    with ThreadPoolExecutor(max_workers=4) as executor:
-            futures = [
-                executor.submit(compute_phrase_embedding, phrase, indices, sentences, lang)
-                for phrase, indices in phrase_info.items()
-            ]
-
-            for future in tqdm(as_completed(futures), total=len(futures), desc="Embedding phrases"):
-                phrase, avg_emb, embedded_vec = future.result()
-                phrase_embeddings[phrase] =  avg_emb
-                all_embeddings[phrase]=embedded_vec
-                central_vecs.append(avg_emb)
-
-    # Calculate the central vector, representing the chunk's topic, by averaging the embedding values of all sentences in the chunk.
-    central_vec = np.mean(central_vecs, axis=0)
+    # The highlighted sentences of all keywords are embedded in one model call
+    # (the model sorts them by length internally, so batches are padded evenly).
+    phrases = list(phrase_info.keys())
+    highlighted_texts = []
+    for phrase in phrases:
+        marked = f"[{phrase}]"
+        highlighted_texts.extend(sentences[idx].replace(phrase, marked) for idx in phrase_info[phrase])
+    counts = np.fromiter((len(phrase_info[phrase]) for phrase in phrases), dtype=np.int64, count=len(phrases))
+    embeddings = get_embeddings_batch(highlighted_texts)  # shape: (sum(counts), D)
+
+    # Each keyword's sentences are a contiguous block of rows: average them with one reduceat
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    emb_array = np.add.reduceat(embeddings, starts, axis=0) / counts[:, None].astype(embeddings.dtype)
+    for i, phrase in enumerate(phrases):
+        phrase_embeddings[phrase] = emb_array[i]
+        all_embeddings[phrase] = embeddings[starts[i]:starts[i] + counts[i]]
 
     # Calculate the centrality score for each keyword by computing similarity with the central vector.
     # Multiply by the tf score to finalize the importance score for each keyword.
     # The top 5 keywords by importance score will be selected as nodes.
-    phrases = list(phrase_embeddings.keys())
-    tf_list = []
-    emb_list = []
+    # Calculate the central vector, representing the chunk's topic, by averaging the keyword embeddings of the chunk.
+    central_vec = emb_array.mean(axis=0)
+    central_sims = _cosine_matrix(emb_array, central_vec[None, :]).ravel()
     if tfidf != []:
-        for phrase in phrases:
-            emb = phrase_embeddings[phrase]
-            tf_adj = tfidf.get(phrase, 0) * cosine_similarity([emb], [central_vec])[0][0]
-            scores[phrase] = [tf_adj, emb]
-            tf_list.append(tf_adj)
-            emb_list.append(emb)
+        weights = [tfidf.get(phrase, 0) for phrase in phrases]
     else:
         tf_scores=get_tf_score(phrase_info, len(sentences))
-        for phrase in phrases:
-            emb = phrase_embeddings[phrase]
-            tf_adj = tf_scores[phrase] * cosine_similarity([emb], [central_vec])[0][0]
-            scores[phrase] = [tf_adj, emb]
-            tf_list.append(tf_adj)
-            emb_list.append(emb)
+        weights = [tf_scores[phrase] for phrase in phrases]
+    # All importance scores in one elementwise product
+    tf_adj = np.asarray(weights, dtype=np.float64) * central_sims
+    for phrase, adj in zip(phrases, tf_adj):
+        scores[phrase] = [adj, phrase_embeddings[phrase]]
 
-    emb_array = np.stack(emb_list)
-    sim_matrix = cosine_similarity(emb_array)
+    sim_matrix = _cosine_matrix(emb_array, emb_array)
 
     return scores, phrases, sim_matrix, all_embeddings
 
@@ -175,29 +229,21 @@ def group_phrases(
     sim_matrix: np.ndarray,
     threshold: float = 0.98
 ) ->dict:
-    ungrouped = list(range(len(phrases)))  # Based on index
+    # Threshold the whole matrix once; a candidate must be similar to the seed in both directions
+    similar = sim_matrix >= threshold
+    similar &= similar.T
+    ungrouped = np.ones(len(phrases), dtype=bool)  # Based on index
     groups = []
 
-    while ungrouped:
-        i = ungrouped.pop()
-        group = [i]
-        to_check = set()
-
-        for j in ungrouped:
-            if sim_matrix[i][j] >= threshold:
-                to_check.add(j)
-
-        #To be in the same group, similarity must be above the threshold with all other noun phrases in the group
-        valid_members = []
-        for j in to_check:
-            if all(sim_matrix[j][k] >= threshold for k in group):
-                valid_members.append(j)
-
-        for j in valid_members:
-            group.append(j)
-            ungrouped.remove(j)
-
-        groups.append(group)
+    # Seeds are taken from the highest remaining index down
+    for i in range(len(phrases) - 1, -1, -1):
+        if not ungrouped[i]:
+            continue
+        ungrouped[i] = False
+        #To be in the same group, similarity must be above the threshold with the seed noun phrase
+        valid_members = np.flatnonzero(similar[i] & ungrouped)
+        ungrouped[valid_members] = False
+        groups.append([i, *valid_members.tolist()])
 
     # Set representative noun phrase: The one with the highest centrality score
     group_infos = {}
@@ -216,38 +262,34 @@ def make_edges(sentences:list[str], source_keyword:str, target_keywords:list[str
     """
     edges=[]
     source=source_keyword[:-1] if source_keyword[-1] == "*" else source_keyword
-    if source in phrase_info.keys():
-        source_idx = [idx for idx in phrase_info[source]]
-    else:
-        source_idx=[]
+    # phrase_info values are sets, so each co-occurrence test is O(1) without copying them into lists
+    source_idx = phrase_info[source] if source in phrase_info else ()
     for t in target_keywords:
         if t != source:
-            target_idx=[idx for idx in phrase_info[t]]
-            relation=""
-            cnt=0
-            for s_idx in source_idx:
-                if cnt>=4:
-                    break
-                if s_idx in target_idx:
-                    edges.append({"source":source_keyword, 
-                    "target":t,
-                    "relation":sentences[s_idx]})
-                    cnt+=1
+            target_idx = phrase_info[t]
+            # Up to 4 sentences where both keywords appear become the relations
+            common = [s_idx for s_idx in source_idx if s_idx in target_idx][:4]
+            for s_idx in common:
+                edges.append({"source":source_keyword, 
+                "target":t,
+                "relation":sentences[s_idx]})
             
-            if cnt==0:
+            if not common:
                 edges.append({"source":source_keyword, 
                         "target":t,
                         "relation":"Related"})
     
     return edges
 
-def make_node(name, s_indices, sentences:list[str], id:tuple, embeddings):
+def make_node(name, s_indices, sentences:list[str], id:tuple, embeddings, pending:list=None):
     """
     Creates a node given a keyword and its occurrence locations (indices).
     args:   name: The keyword to create a node for.
             s_indices: The list of indices where the keyword appears.
             sentences: A list of strings (sentences) from the full text.
             id: tuple containing (brain_id, source_id)
+            pending: If given, (node, embeddings) is appended here to be stored later
+                     with `store_node_embeddings` instead of being upserted immediately.
     """
     description=[]
     ori_sentences=[]
@@ -269,11 +311,23 @@ def make_node(name, s_indices, sentences:list[str], id:tuple, embeddings):
                             "score": 1.0}) 
     
     node={"label":name, "name":name,"source_id":source_id, "descriptions":description, "original_sentences":ori_sentences}
-    store_embeddings(node, brain_id, embeddings)
+    if pending is None:
+        store_embeddings(node, brain_id, embeddings)
+    else:
+        pending.append((node, embeddings))
 
     return node
 
 
+# Sentence splitting patterns, compiled once at import
+_INTRA_LINE_RE = re.compile(r'(?<=[.!?])\s+|(?<=[다요]\.)\s*')
+# [ List marker split pattern ]
+_LIST_MARKER_SPLIT_RE = re.compile(r'(?=[0-9a-zA-Z가-힣]\.\s+)')
+_LIST_MARKER_REMOVAL_RE = re.compile(r'\s+[0-9a-zA-Z가-힣]\.')
+_NEWLINE_SPLIT_RE = re.compile(r'(\n)')
+_NON_CONTENT_CHARS_RE = re.compile(r'[^a-zA-Z0-9가-힣]')
+
+
 def split_into_tokenized_sentence(text: str) -> tuple[List, List[str]]:
     """
     Splits the text into sentences.
@@ -296,14 +350,8 @@ def split_into_tokenized_sentence(text: str) -> tuple[List, List[str]]:
     if not cleaned_text:
         return (tokenized_sentences, final_sentences)
    
-    intra_line_pattern = r'(?<=[.!?])\s+|(?<=[다요]\.)\s*|(?<=[^a-zA-Z가-힣\s,()[]{}=-%^$@])\s+'
-    
-    # [ List marker split pattern ]
-    list_marker_split_pattern = r'(?=[0-9a-zA-Z가-힣]\.\s+)'
-    list_marker_pattern_for_removal = r'\s+[0-9a-zA-Z가-힣]\.'
-   
     # [ Step 1: Newline Handling ]
-    blocks = re.split(r'(\n)', cleaned_text)
+    blocks = _NEWLINE_SPLIT_RE.split(cleaned_text)
     
     merged_lines = []
     current_line = ""
@@ -340,7 +388,7 @@ def split_into_tokenized_sentence(text: str) -> tuple[List, List[str]]:
     for line in merged_lines:
         # Both short lines (<= 25 chars) and long merged lines (> 25 chars)
         # attempt to split them further using intra_line_pattern
-        sub_sentences = re.split(intra_line_pattern, line)
+        sub_sentences = _INTRA_LINE_RE.split(line)
         candidate_sentences.extend(sub_sentences)
    
    
@@ -352,20 +400,20 @@ def split_into_tokenized_sentence(text: str) -> tuple[List, List[str]]:
             continue
    
         # Perform additional splitting before list markers (1., a., etc.)
-        sub_fragments = re.split(list_marker_split_pattern, s)
+        sub_fragments = _LIST_MARKER_SPLIT_RE.split(s)
    
         for fragment in sub_fragments:
             fragment = fragment.strip()
    
             # Detect and remove list markers ("1. ", "a. ")
-            fragment = re.sub(list_marker_pattern_for_removal, '', fragment)
+            fragment = _LIST_MARKER_REMOVAL_RE.sub('', fragment)
             fragment = fragment.strip() # Remove any remaining whitespace after marker removal
             
             if not fragment:
                 continue
    
             # Original filtering logic (length, actual character count)
-            real_chars = re.sub(r'[^a-zA-Z0-9가-힣]', '', fragment)
+            real_chars = _NON_CONTENT_CHARS_RE.sub('', fragment)
             if len(fragment) <= 1 or len(real_chars) <= 1:
                 continue
             
@@ -374,17 +422,30 @@ def split_into_tokenized_sentence(text: str) -> tuple[List, List[str]]:
    
     texts = final_sentences
     
-    lang="en"
-    # Detect the language of each sentence and embed using the appropriate embedding model
+    # Detect the language of each sentence first so that English sentences can be parsed in batches
+    langs = [check_lang(sentence) for sentence in texts]
+    en_sentences = [sentence for sentence, lang in zip(texts, langs) if lang == "en"]
+    ko_sentences = [sentence for sentence, lang in zip(texts, langs) if lang == "ko"]
+    if SPACY_N_PROCESS > 1 and len(en_sentences) >= 256:
+        en_docs = iter(list(nlp_en.pipe(en_sentences, batch_size=32, n_process=SPACY_N_PROCESS)))
+    else:
+        en_docs = iter(nlp_en.pipe(en_sentences, batch_size=64))
+    if mecab is not None and len(ko_sentences) > 1:
+        with ThreadPoolExecutor(max_workers=KO_POS_WORKERS) as executor:
+            ko_tokens = iter(list(executor.map(extract_noun_phrases_ko, ko_sentences)))
+    else:
+        ko_tokens = map(extract_noun_phrases_ko, ko_sentences)
+
+    # Extract noun phrases with the tool for each language (both batches come back in input order)
     for idx, sentence in enumerate(texts):
-        lang = check_lang(sentence)
+        lang = langs[idx]
    
         # Call Korean embedding model
         if lang == "ko":
-            tokens = extract_noun_phrases_ko(sentence)
+            tokens = next(ko_tokens)
         # Call English embedding model
         elif lang == "en":
-            tokens = extract_noun_phrases_en(sentence)
+            tokens = _noun_phrases_from_doc(next(en_docs))
         else:
             tokens = [sentence.strip()]
    
@@ -399,7 +460,7 @@ def split_into_tokenized_sentence(text: str) -> tuple[List, List[str]]:
 
         
 
-def _extract_from_chunk(phrases:list[list[str]], sentences: list[str], id:tuple ,keyword: str, already_made:list[str], tfidf:dict) -> tuple[dict, dict, list[str]]:
+def _extract_from_chunk(phrases:list[list[str]], sentences: list[str], id:tuple ,keyword: str, already_made:set[str], tfidf:dict) -> tuple[dict, dict, set[str]]:
     """
     Called with the finally divided (finalized) chunk as input.
     Calculates importance scores for keywords within the chunk and generates nodes and edges based on these scores.
@@ -408,19 +469,20 @@ def _extract_from_chunk(phrases:list[list[str]], sentences: list[str], id:tuple
     """
     nodes=[]
     edges=[]
+    # (node, embeddings) pairs of this chunk, upserted to Qdrant together at the end
+    pending=[]
 
     # To enable searching for all sentence indices where a specific noun phrase appears,
     # create a dictionary where each noun phrase is a key, 
     # and the value is a list of indices of sentences where it appeared.
     phrase_info = defaultdict(set)
-    lang ="en"
 
     for idx, p in enumerate(phrases):
         for token in p:
             phrase_info[token].add(idx)
     
     # Calculate the importance score for each keyword
-    phrase_scores, phrases, sim_matrix, all_embeddings = compute_scores(phrase_info, sentences, lang, tfidf)
+    phrase_scores, phrases, sim_matrix, all_embeddings = compute_scores(phrase_info, sentences, tfidf)
     # Group highly similar keywords; if one keyword in a group is selected as a node, other members become child nodes.
     groups=group_phrases(phrases, phrase_scores, sim_matrix)
 
@@ -438,7 +500,7 @@ def _extract_from_chunk(phrases:list[list[str]], sentences: list[str], id:tuple
         else:
             find = keyword
         if find in contents:
-            nodes.append(make_node(keyword, list(phrase_info[find]), sentences, id, all_embeddings[find]))
+            nodes.append(make_node(keyword, list(phrase_info[find]), sentences, id, all_embeddings[find], pending))
         else:
             return [], [], already_made
 
@@ -446,13 +508,13 @@ def _extract_from_chunk(phrases:list[list[str]], sentences: list[str], id:tuple
     for t in sorted_keywords:
         # Create edges between {the chunk's topic keyword node} and {the top-scoring keywords within the chunk}
         if keyword != "":
-            edges+=make_edges(sentences, keyword, [t], phrase_info)
+            edges.extend(make_edges(sentences, keyword, [t], phrase_info))
 
         else:
             break
         if t not in already_made:
-            nodes.append(make_node(t, list(phrase_info[t]), sentences, id, all_embeddings[t]))
-            already_made.append(t)
+            nodes.append(make_node(t, list(phrase_info[t]), sentences, id, all_embeddings[t], pending))
+            already_made.add(t)
             cnt+=1
             
             # If there are keywords highly similar to the selected node, create them as child nodes
@@ -461,17 +523,29 @@ def _extract_from_chunk(phrases:list[list[str]], sentences: list[str], id:tuple
                 for idx in range(min(len(groups[t]), 5)):
                     if phrases[idx] not in already_made:
                         related_keywords.append(phrases[idx])
-                        already_made.append(phrases[idx])
-                        node=make_node(phrases[idx], list(phrase_info[t]), sentences, id, all_embeddings[phrases[idx]])
+                        already_made.add(phrases[idx])
+                        node=make_node(phrases[idx], list(phrase_info[t]), sentences, id, all_embeddings[phrases[idx]], pending)
                         nodes.append(node)
-                        edge=make_edges(sentences, t, related_keywords, phrase_info)
-                        edges+=edge  
+                        edges.extend(make_edges(sentences, t, related_keywords, phrase_info))
                     
         if cnt==5:
             break
+
+    store_node_embeddings(pending, id[0])
     return nodes, edges, already_made
 
+_HANGUL_RE = re.compile(r'[가-힣]')
+_ASCII_LETTER_RE = re.compile(r'[A-Za-z]')
+
 def check_lang(text:str):
+    # Only Korean and English are handled, so decide the clear cases by script before running langid
+    num_hangul = len(_HANGUL_RE.findall(text))
+    num_ascii = len(_ASCII_LETTER_RE.findall(text))
+    if num_hangul > num_ascii:
+        return "ko"
+    if num_ascii and not num_hangul:
+        return "en"
+    # Mixed or letterless text: fall back to langid
     lang, _ =langid.classify(text)
     return lang
 
@@ -22,7 +22,9 @@ TEST_FILES = [
     "file_tests/pdf/test_pdf_integration.py",
     "file_tests/textfile/test_textfile_integration.py",
     "file_tests/mds/test_mds_integration.py",
-    "memo_tests/test_memo_integration.py"
+    "memo_tests/test_memo_integration.py",
+    "services_tests/test_embedding_service.py",
+    "services_tests/test_manual_chunking.py"
 ]
 
 # 전역 변수로 현재 실행 중인 프로세스 추적
@@ -0,0 +1,2 @@
+# 서비스 계층 단위 테스트
+# 서버 없이 services 모듈의 임베딩/청킹/노드 생성 로직을 직접 검증합니다.
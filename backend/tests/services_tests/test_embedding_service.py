@@ -0,0 +1,94 @@
+import os
+import sys
+import torch
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+# 로컬 디스크 Qdrant는 실행 중인 서버와 저장소 잠금을 공유하므로, 임포트 시 원격 클라이언트를 만들도록 지정
+os.environ.setdefault("QDRANT_URL", "http://localhost:6333")
+from services import embedding_service as es
+
+
+class FakeTokenizer:
+    """단어 하나를 토큰 하나로 취급하는 테스트용 토크나이저"""
+    cls_token_id = 101
+    sep_token_id = 102
+    pad_token_id = 0
+    model_input_names = ["input_ids", "token_type_ids", "attention_mask"]
+
+    def __call__(self, texts, add_special_tokens=True, truncation=False, max_length=None):
+        single = isinstance(texts, str)
+        rows = []
+        for text in ([texts] if single else texts):
+            ids = [1000 + len(word) for word in text.split()]
+            if add_special_tokens:
+                ids = [self.cls_token_id, *ids, self.sep_token_id]
+            if truncation and max_length:
+                ids = ids[:max_length]
+            rows.append(ids)
+        return {"input_ids": rows[0] if single else rows}
+
+
+class FakeCompiledModel:
+    """forward 입력 모양을 기록하고, 각 행의 실제 토큰 수를 원-핫 벡터로 돌려주는 모델"""
+    device = "cpu"
+
+    def __init__(self):
+        self.tokenizer = FakeTokenizer()
+        self.shapes = []
+
+    def __call__(self, features):
+        input_ids = features["input_ids"]
+        self.shapes.append(tuple(input_ids.shape))
+        lengths = features["attention_mask"].sum(dim=1)
+        out = torch.zeros((input_ids.shape[0], es.EMBED_DIM))
+        out[torch.arange(input_ids.shape[0]), lengths] = 1.0
+        return {"sentence_embedding": out}
+
+
+class TestEmbeddingService:
+    """embedding_service 단위 테스트"""
+
+    def test_bucketed_encode_mixed_lengths(self):
+        """길이가 섞인 배치도 워밍업한 (배치 크기, 길이 구간) 모양으로만 forward 되는지 테스트"""
+        model = FakeCompiledModel()
+        # 1~300 단어 길이가 섞인 150개 문장 -> 64/64/22개 배치, 256 토큰 초과는 잘림
+        texts = [" ".join(["word"] * ((i * 37) % 300 + 1)) for i in range(150)]
+
+        embeddings = es._encode_bucketed(model, texts)
+
+        allowed = {(es.ENCODE_BATCH_SIZE, length) for length in es.COMPILE_WARMUP_LENGTHS}
+        assert len(model.shapes) == 3
+        assert set(model.shapes) <= allowed
+        assert embeddings.shape == (len(texts), es.EMBED_DIM)
+        # 정렬/패딩 후에도 각 결과가 원래 입력 순서의 문장과 맞는지 (원-핫 위치 = 특수 토큰 포함 토큰 수)
+        for text, vector in zip(texts, embeddings):
+            expected = min(len(text.split()) + 2, es.COMPILE_WARMUP_LENGTHS[-1])
+            assert int(vector.argmax()) == expected
+
+        print(f"버킷 임베딩 테스트 완료: forward 입력 모양 {model.shapes}")
+
+    def test_bucket_length(self):
+        """토큰 수가 가장 짧은 상위 길이 구간으로 올림되는지 테스트"""
+        assert es._bucket_length(1) == 64
+        assert es._bucket_length(64) == 64
+        assert es._bucket_length(65) == 128
+        assert es._bucket_length(256) == 256
+
+        print("길이 구간 테스트 완료")
+
+
+if __name__ == "__main__":
+    test_instance = TestEmbeddingService()
+
+    print("embedding_service 단위 테스트 시작")
+    print("=" * 50)
+
+    try:
+        test_instance.test_bucketed_encode_mixed_lengths()
+        test_instance.test_bucket_length()
+
+        print("=" * 50)
+        print("모든 embedding_service 단위 테스트 통과!")
+
+    except Exception as e:
+        print(f"테스트 실패: {str(e)}")
+        raise
@@ -0,0 +1,164 @@
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+# 로컬 디스크 Qdrant는 실행 중인 서버와 저장소 잠금을 공유하므로, 임포트 시 원격 클라이언트를 만들도록 지정
+os.environ.setdefault("QDRANT_URL", "http://localhost:6333")
+from services import manual_chunking_sentences as mcs
+
+# 주제가 다른 문단 3개로 이루어진 테스트 텍스트 (문단마다 같은 주제 문장 10개, LDA 경로를 타도록 10문장 이상)
+TOPIC_SENTENCES = [
+    "The Apollo program sent astronauts to the Moon with the Saturn rocket.",
+    "Neil Armstrong walked on the Moon during the Apollo mission.",
+    "Photosynthesis lets every plant turn sunlight into sugar inside the leaf.",
+    "Chlorophyll in the leaf absorbs sunlight for photosynthesis.",
+    "The Python language uses indentation to mark each code block.",
+    "Guido van Rossum designed Python as a readable programming language.",
+]
+TEST_TEXT = " ".join(TOPIC_SENTENCES[2 * (i // 10) + i % 2] for i in range(30))
+
+
+class TestManualChunking:
+    """manual_chunking_sentences 단위 테스트"""
+
+    def test_nonrecurrsive_chunking_splits_at_weakest_links(self):
+        """depth 5 이상 긴 청크가 유사도가 가장 낮은 지점에서 최대 5개의 연속 그룹으로 나뉘는지 테스트"""
+        chunk = list(range(10, 22))
+        consec_sim = np.full(30, 0.9)
+        # 청크 내부의 가장 약한 연결 4곳: 12|13, 15|16, 17|18, 20|21
+        consec_sim[[12, 15, 17, 20]] = [0.1, 0.2, 0.3, 0.4]
+        # 청크 밖의 값은 무시되어야 함
+        consec_sim[[5, 25]] = 0.0
+
+        result = mcs.nonrecurrsive_chunking(chunk, consec_sim, "topic*")
+
+        assert [r["chunks"] for r in result] == [
+            [10, 11, 12], [13, 14, 15], [16, 17], [18, 19, 20], [21]
+        ]
+        assert all(r["keyword"] == "topic*" for r in result)
+        assert mcs.nonrecurrsive_chunking([], consec_sim, "topic*") == []
+        assert mcs.nonrecurrsive_chunking([3], consec_sim, "topic*") == [{"chunks": [3], "keyword": "topic*"}]
+
+        print(f"nonrecurrsive_chunking 테스트 완료: {[r['chunks'] for r in result]}")
+
+    def test_recurrsive_chunking_flag3_path(self):
+        """depth 5에서 500토큰을 넘는 청크가 nonrecurrsive_chunking 결과로 반환되는지 테스트"""
+        sentence_tokens = [[f"word{i}"] * 60 for i in range(12)]
+        token_prefix = mcs.token_prefix_sums(sentence_tokens)
+        consec_sim = np.linspace(0.1, 0.9, 11)
+        chunk = list(range(12))
+
+        result, nodes_and_edges, _ = mcs.recurrsive_chunking(
+            chunk, "src", 5, "topic*", set(), consec_sim, 0.5,
+            token_prefix=token_prefix, sentence_tokens=sentence_tokens
+        )
+
+        assert len(result) == 5
+        assert [idx for r in result for idx in r["chunks"]] == chunk
+        assert nodes_and_edges == {"nodes": [], "edges": []}
+
+        print(f"flag 3 재귀 청킹 테스트 완료: {len(result)}개 그룹")
+
+    def test_manual_chunking_runs(self):
+        """manual_chunking이 예외 없이 원문 문장으로 구성된 청크 텍스트를 반환하는지 테스트"""
+        final_chunks = mcs.manual_chunking(TEST_TEXT)
+
+        assert isinstance(final_chunks, list)
+        assert len(final_chunks) > 0
+        assert all(isinstance(c, str) and c for c in final_chunks)
+        assert all(any(s.rstrip(".") in c for s in TOPIC_SENTENCES) for c in final_chunks)
+
+        print(f"manual_chunking 테스트 완료: {len(final_chunks)}개 청크")
+
+    def test_extract_graph_components_keyword_alignment(self):
+        """최종 청크마다 자기 청크의 키워드로 노드가 추출되고, 빈 키워드 청크는 건너뛰는지 테스트"""
+        sentences = [f"Sentence {i}." for i in range(6)]
+        tokenized = [{"tokens": [f"token{i}"], "index": i} for i in range(6)]
+        # 첫 청크는 키워드가 비어 있고, 둘째 청크는 여러 문장으로 구성 (문장 단위로 키워드를 쌓으면 어긋나는 경우)
+        chunks = [
+            {"chunks": [0], "keyword": ""},
+            {"chunks": [1, 2, 3], "keyword": "alpha*"},
+            {"chunks": [4, 5], "keyword": "beta*"},
+        ]
+        calls = []
+
+        def fake_extract(tokenized_chunk, chunk_sentences, id, keyword, already_made, tfidf):
+            calls.append((chunk_sentences, keyword))
+            return [{"name": keyword, "chunk_sentences": chunk_sentences}], [], already_made
+
+        originals = {name: getattr(mcs, name) for name in
+                     ("split_into_tokenized_sentence", "recurrsive_chunking", "store_embeddings_batch", "_extract_from_chunk")}
+        mcs.split_into_tokenized_sentence = lambda text: (tokenized, sentences)
+        mcs.recurrsive_chunking = lambda *args, **kwargs: (chunks, {"nodes": [], "edges": []}, set())
+        mcs.store_embeddings_batch = lambda nodes, brain_id: None
+        mcs._extract_from_chunk = fake_extract
+        try:
+            # 2000자 이상이면 재귀 청킹 경로를 탐
+            nodes, _ = mcs.extract_graph_components("x" * 2000, ("brain", "src"))
+        finally:
+            for name, func in originals.items():
+                setattr(mcs, name, func)
+
+        assert calls == [
+            (["Sentence 1.", "Sentence 2.", "Sentence 3."], "alpha*"),
+            (["Sentence 4.", "Sentence 5."], "beta*"),
+        ]
+        assert [n["name"] for n in nodes] == ["alpha*", "beta*"]
+
+        print(f"청크 키워드 정렬 테스트 완료: {[keyword for _, keyword in calls]}")
+
+    def test_gen_node_edges_keyword_per_group(self):
+        """그룹별 키워드가 자기 그룹 위치에 들어가고, 새 주제가 없는 그룹은 "none"으로 남는지 테스트"""
+        sentence_tokens = [
+            ["apple", "apple"],
+            ["banana", "banana"],
+            ["cherry", "cherry"],
+            ["cherry", "date"],
+            ["elder"] * 16,
+        ]
+        token_prefix = mcs.token_prefix_sums(sentence_tokens)
+        chunk = [0, 1, 2, 3, 4]
+        # 첫 그룹의 유일한 주제(apple)는 이미 노드가 있으므로 새 키워드가 없음
+        new_chunk_groups = [[0], [1], [2, 3], [4]]
+        already_made = {"apple"}
+
+        nodes, edges, go_chunk, keywords = mcs.gen_node_edges_for_new_groups(
+            chunk, new_chunk_groups, "root*", already_made, "src", sentence_tokens, token_prefix
+        )
+
+        assert go_chunk == [[0], [1], [2, 3], [4]]
+        # 15토큰 이상인 그룹은 설명 없는 연결 노드(키워드*)가 됨
+        assert keywords == ["none", "banana", "cherry", "elder*"]
+        assert [n["name"] for n in nodes] == ["banana", "cherry", "elder*"]
+        assert [e["target"] for e in edges] == ["banana", "cherry", "elder*"]
+        assert all(e["source"] == "root*" for e in edges)
+        # 각 노드의 키워드는 자기 그룹의 토큰에서 나옴
+        for idx, keyword in enumerate(keywords):
+            if keyword != "none":
+                group_tokens = {t for s_idx in go_chunk[idx] for t in sentence_tokens[s_idx]}
+                assert keyword.rstrip("*") in group_tokens
+        assert nodes[1]["descriptions"] == [2, 3]
+        assert already_made == {"apple", "banana", "cherry", "elder"}
+
+        print(f"그룹 키워드 정렬 테스트 완료: {keywords}")
+
+
+if __name__ == "__main__":
+    test_instance = TestManualChunking()
+
+    print("manual_chunking_sentences 단위 테스트 시작")
+    print("=" * 50)
+
+    try:
+        test_instance.test_nonrecurrsive_chunking_splits_at_weakest_links()
+        test_instance.test_recurrsive_chunking_flag3_path()
+        test_instance.test_manual_chunking_runs()
+        test_instance.test_extract_graph_components_keyword_alignment()
+        test_instance.test_gen_node_edges_keyword_per_group()
+
+        print("=" * 50)
+        print("모든 manual_chunking_sentences 단위 테스트 통과!")
+
+    except Exception as e:
+        print(f"테스트 실패: {str(e)}")
+        raise